@@ -1,23 +1,85 @@
 import os
+import sys
+import json
+import hmac
+import signal
 import logging
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-from bot_manager import BotManager
+import threading
+import time
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, jsonify
+from bot_tokens import bot_id_from_token
+from metrics import render_prometheus
+from log_pipeline import setup_logging
+from startup import LazyManager
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging (records are written by a background thread, see log_pipeline.py)
+setup_logging()
 
 # Create the Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
 
-# Initialize bot manager
-bot_manager = BotManager()
+def create_bot_manager():
+    """Build the bot manager (BOT_WORKERS > 0 spreads bots across worker processes)"""
+    bot_workers = int(os.environ.get("BOT_WORKERS", "0"))
+    if bot_workers > 0:
+        from supervisor import BotSupervisor
+        return BotSupervisor(bot_workers, placement=os.environ.get("BOT_PLACEMENT", "least_loaded"))
+    from bot_manager import BotManager
+    return BotManager()
+
+# discord.py and the command catalog load when the first bot starts, not when the app starts
+bot_manager = LazyManager(create_bot_manager)
+if os.environ.get("PRELOAD_BOT_MANAGER", "0") not in ('0', 'false', 'off'):
+    bot_manager.preload()
+
+# On the threaded development server every open status stream and job long-poll
+# holds a thread, so both are bounded; the ASGI entry point (asgi.py) awaits them
+# natively instead
+MAX_JOB_WAIT = 10
+STATUS_STREAM_LIFETIME = 300
+status_streams = threading.BoundedSemaphore(int(os.environ.get("MAX_STATUS_STREAMS", "4")))
+
+def parse_shard_ids(value):
+    """Parse a shard ID list like "0-3" or "0,2,5" """
+    shard_ids = []
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            shard_ids.extend(range(int(first), int(last) + 1))
+        else:
+            shard_ids.append(int(part))
+    return sorted(set(shard_ids)) or None
+
+def start_options(form):
+    """Read the optional sharding and cache fields of the start form"""
+    options = {}
+    if form.get('cache_profile'):
+        options['cache_profile'] = form['cache_profile']
+    if form.get('sharded'):
+        options['sharded'] = True
+    if form.get('shard_count', '').strip():
+        options['shard_count'] = int(form['shard_count'])
+    if form.get('shard_ids', '').strip():
+        options['shard_ids'] = parse_shard_ids(form['shard_ids'])
+    return options
+
+def require_admin():
+    """Get a 403 response unless the request carries ADMIN_TOKEN; admin routes stay closed while it is unset"""
+    admin_token = os.environ.get("ADMIN_TOKEN")
+    given = request.headers.get('X-Admin-Token', request.form.get('admin_token')) or ''
+    if not admin_token or not hmac.compare_digest(given.encode(), admin_token.encode()):
+        return jsonify({'success': False, 'message': 'Forbidden'}), 403
+    return None
 
 @app.route('/')
 def index():
     """Main page with token input form"""
     bot_status = bot_manager.get_status()
-    return render_template('index.html', bot_status=bot_status)
+    return render_template('index.html', bot_status=bot_status, start_job=request.args.get('job'))
 
 @app.route('/premium')
 def premium():
@@ -29,6 +91,15 @@ def admin():
     """Admin page - Under maintenance"""
     return render_template('maintenance.html', feature="Admin Panel")
 
+@app.route('/admin/reload_commands', methods=['POST'])
+def reload_commands():
+    """Hot-reload command handlers and catalog.json into every running bot"""
+    forbidden = require_admin()
+    if forbidden:
+        return forbidden
+    success, message = bot_manager.reload_commands()
+    return jsonify({'success': success, 'message': message}), 200 if success else 500
+
 @app.route('/start_bot', methods=['POST'])
 def start_bot():
     """Start the Discord bot with the provided token"""
@@ -43,16 +114,23 @@ def start_bot():
         flash('Formato de token inválido. Los tokens de Discord bots suelen ser más largos.', 'error')
         return redirect(url_for('index'))
     
-    # Check if bot is already running
-    if bot_manager.is_running():
-        flash('El bot ya está ejecutándose. Deténlo primero antes de iniciar con un nuevo token.', 'warning')
+    # Check if this bot is already running
+    if bot_manager.is_running(bot_id_from_token(token)):
+        flash('Este bot ya está ejecutándose. Deténlo primero antes de iniciarlo de nuevo.', 'warning')
         return redirect(url_for('index'))
     
     try:
-        # Start the bot (always free version now)
-        success, message = bot_manager.start_bot(token)
+        options = start_options(request.form)
+    except ValueError:
+        flash('Configuración de shards inválida. Usa un número de shards y IDs como "0-3" o "0,2".', 'error')
+        return redirect(url_for('index'))
+    
+    try:
+        # Start the bot without waiting for the gateway handshake (always free version now)
+        success, message, job_id = bot_manager.start_bot_async(token, **options)
         if success:
-            flash('¡Bot iniciado exitosamente!', 'success')
+            flash('Iniciando bot... conectando con Discord.', 'success')
+            return redirect(url_for('index', job=job_id))
         else:
             flash(f'Error al iniciar bot: {message}', 'error')
     except Exception as e:
@@ -63,10 +141,14 @@ def start_bot():
 
 @app.route('/stop_bot', methods=['POST'])
 def stop_bot():
-    """Stop the running Discord bot"""
+    """Stop a running Discord bot (or all bots when no ID is given)"""
+    bot_id = request.form.get('bot_id') or None
     try:
-        success, message = bot_manager.stop_bot()
-        if success:
+        # Closing happens on the bot loop; the status stream reports when it finishes
+        success, message = bot_manager.stop_bot(bot_id, wait=0)
+        if success and 'stopping' in message:
+            flash('Deteniendo bot...', 'success')
+        elif success:
             flash('¡Bot detenido exitosamente!', 'success')
         else:
             flash(f'Error al detener bot: {message}', 'error')
@@ -79,7 +161,97 @@ def stop_bot():
 @app.route('/bot_status')
 def bot_status():
     """API endpoint to get bot status"""
-    return jsonify(bot_manager.get_status())
+    return jsonify(bot_manager.get_status(request.args.get('bot_id')))
+
+@app.route('/bot_status/stream')
+def bot_status_stream():
+    """Server-Sent Events stream that pushes bot status whenever it changes"""
+    if not status_streams.acquire(blocking=False):
+        # The page falls back to polling /bot_status
+        return jsonify({'error': 'Too many status streams'}), 503, {'Retry-After': '30'}
+
+    def events():
+        status_events = bot_manager.status_events
+        # End the stream now and then so the browser reconnects and a thread is never held for good
+        deadline = time.monotonic() + STATUS_STREAM_LIFETIME
+        while time.monotonic() < deadline:
+            version = status_events.version
+            yield f"data: {json.dumps(bot_manager.get_status())}\n\n"
+            # Comment lines keep proxies from closing an idle stream
+            while status_events.wait(version, timeout=15) == version:
+                if time.monotonic() >= deadline:
+                    return
+                yield ": keepalive\n\n"
+    
+    response = Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    response.call_on_close(status_streams.release)
+    return response
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """API endpoint to poll (or wait up to ?wait=<seconds>, at most MAX_JOB_WAIT, for) a bot start job"""
+    try:
+        wait = min(max(float(request.args.get('wait', 0)), 0), MAX_JOB_WAIT)
+    except ValueError:
+        wait = 0
+    job = bot_manager.get_job(job_id, wait=wait)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/loop_status')
+def loop_status():
+    """API endpoint for event loop lag and recent stalls"""
+    # Stalls carry stack traces
+    forbidden = require_admin()
+    if forbidden:
+        return forbidden
+    return jsonify(bot_manager.get_loop_status())
+
+@app.route('/bots/<bot_id>/profile', methods=['GET', 'POST'])
+def bot_profile(bot_id):
+    """Toggle (POST enabled=1|0) or read the sampling profile of a bot"""
+    forbidden = require_admin()
+    if forbidden:
+        return forbidden
+    if request.method == 'POST':
+        enabled = request.form.get('enabled', request.args.get('enabled', '1')) not in ('0', 'false', 'off')
+        success, message = bot_manager.set_profiling(bot_id, enabled)
+        return jsonify({'success': success, 'message': message}), 200 if success else 404
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except ValueError:
+        limit = 20
+    profile = bot_manager.get_profile(bot_id, limit=limit)
+    if profile is None:
+        return jsonify({'error': 'Bot is not running'}), 404
+    return jsonify(profile)
+
+@app.route('/admin/capture', methods=['GET', 'POST'])
+def gateway_capture():
+    """Start (POST enabled=1) or stop (POST enabled=0) the gateway capture, or read its status"""
+    forbidden = require_admin()
+    if forbidden:
+        return forbidden
+    if request.method == 'POST':
+        if request.form.get('enabled', request.args.get('enabled', '1')) not in ('0', 'false', 'off'):
+            hash_content = request.form.get('hash', request.args.get('hash', '1')) not in ('0', 'false', 'off')
+            # Recording message text verbatim has to be switched on in the server's config, not per request
+            if not hash_content and os.environ.get("GATEWAY_CAPTURE_HASH", "1") not in ('0', 'false', 'off'):
+                return jsonify({'success': False, 'message': 'Unhashed capture needs GATEWAY_CAPTURE_HASH=0'}), 403
+            success, message = bot_manager.start_capture(hash_content=hash_content)
+        else:
+            success, message = bot_manager.stop_capture()
+        return jsonify({'success': success, 'message': message}), 200 if success else 400
+    return jsonify(bot_manager.get_capture_status())
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint for command and Discord REST metrics"""
+    return Response(render_prometheus(bot_manager.get_metrics()), mimetype='text/plain; version=0.0.4')
 
 @app.errorhandler(404)
 def not_found_error(error):
@@ -91,4 +263,6 @@ def internal_error(error):
     return render_template('index.html', error='Error interno del servidor'), 500
 
 if __name__ == '__main__':
+    # Exit normally on SIGTERM so the bot manager's exit hook saves resumable gateway sessions
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from typing import Any, Dict
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as web
+
+# Comment lines keep proxies from closing an idle stream
+KEEPALIVE_INTERVAL = 15
+
+
+class ControlPlane:
+    """ASGI app that serves the long-waiting control-plane routes natively and hands the rest to Flask.
+
+    WsgiToAsgi runs every Flask view on one shared thread, so a view that waits
+    (a job long-poll, a status stream) would hold up every other request. These
+    routes await the bot manager instead and cost no thread while they wait.
+    """
+
+    def __init__(self, flask_app):
+        self.wsgi = WsgiToAsgi(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            path = scope['path']
+            if path == '/bot_status/stream':
+                return await self.status_stream(receive, send)
+            if path.startswith('/jobs/') and '/' not in path[len('/jobs/'):]:
+                return await self.job_status(path[len('/jobs/'):], scope, send)
+        await self.wsgi(scope, receive, send)
+
+    async def job_status(self, job_id: str, scope, send):
+        """Poll (or wait up to ?wait=<seconds>, at most MAX_JOB_WAIT, for) a bot start job"""
+        query = parse_qs(scope.get('query_string', b'').decode())
+        try:
+            wait = min(max(float(query.get('wait', ['0'])[0]), 0), web.MAX_JOB_WAIT)
+        except ValueError:
+            wait = 0
+        job = await web.bot_manager.get_job_async(job_id, wait=wait)
+        if job is None:
+            return await send_json(send, {'error': 'Job not found'}, 404)
+        await send_json(send, job)
+
+    async def status_stream(self, receive, send):
+        """Server-Sent Events stream that pushes bot status whenever it changes"""
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        events = asyncio.ensure_future(self._status_events(send))
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            await asyncio.wait({events, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            events.cancel()
+            disconnected.cancel()
+        if events.done() and not events.cancelled() and events.exception() is not None:
+            raise events.exception()
+
+    async def _status_events(self, send):
+        status_events = web.bot_manager.status_events
+        while True:
+            version = status_events.version
+            # A supervisor asks its worker processes, so don't read the status on the loop
+            status = await asyncio.to_thread(web.bot_manager.get_status)
+            await send_chunk(send, f"data: {json.dumps(status)}\n\n")
+            while await status_events.changed(version, KEEPALIVE_INTERVAL) == version:
+                await send_chunk(send, ": keepalive\n\n")
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def send_chunk(send, text: str):
+    await send({'type': 'http.response.body', 'body': text.encode(), 'more_body': True})
+
+
+async def send_json(send, data: Dict[str, Any], status: int = 200):
+    body = json.dumps(data).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+asgi_app = ControlPlane(web.app)
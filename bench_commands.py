@@ -0,0 +1,351 @@
+"""Microbenchmarks for the command handlers, run against an offline bot.
+
+    python bench_commands.py                       # every command
+    python bench_commands.py --tracked             # only the commands we track closely
+    python bench_commands.py --save baseline.json  # store the results
+    python bench_commands.py --baseline baseline.json --threshold 1.25
+
+Each command goes through the same path as a real message (get_context with
+QueuedContext, argument conversion, the handler, the outbound queue and discord.py's
+message serialization); only the REST layer is replaced by canned responses.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import discord
+from discord.http import HTTPClient
+
+from bot_manager import BotManager, BotInstance
+from catalog import get_catalog
+from outbound import QueuedContext
+
+# Snowflake-sized IDs: the converters only treat 15-20 digit numbers as IDs
+BOT_ID, AUTHOR_ID, TARGET_ID = 800000000000000001, 800000000000000002, 800000000000000003
+GUILD_ID, CHANNEL_ID, VOICE_CHANNEL_ID = 800000000000000004, 800000000000000005, 800000000000000006
+MODERATOR_ROLE_ID, MEMBER_ROLE_ID = 800000000000000007, 800000000000000008
+TIMESTAMP = '2024-01-01T00:00:00+00:00'
+
+# Commands whose cost we most need to keep an eye on
+TRACKED = ('help', 'calc', 'convert', 'userinfo', 'balance', 'daily', 'give', 'shop')
+
+# Arguments for each command; commands not listed are invoked without any
+MENTION = f'<@{TARGET_ID}>'
+ARGUMENTS = {
+    'avatar': MENTION,
+    'roast': MENTION,
+    'compliment': MENTION,
+    'rps': 'rock',
+    'dice': '20',
+    '8ball': 'will this benchmark pass?',
+    'poll': 'Pizza tonight?',
+    'timer': '60',
+    'remind': '5m stretch your legs',
+    'weather': 'London',
+    'userinfo': MENTION,
+    'joined': MENTION,
+    'created': MENTION,
+    'shorten': 'https://example.com/a/rather/long/path?with=query',
+    'password': '16',
+    'qr': 'hello world',
+    'base64': 'encode hello world',
+    'random': '1 100',
+    'choose': 'tea coffee water',
+    'calc': '2 + 3 * (4 - 1) ^ 2',
+    'convert': '100 cm m',
+    'fibonacci': '30',
+    'reverse': 'hello world',
+    'upper': 'hello world',
+    'lower': 'HELLO WORLD',
+    'count': 'the quick brown fox jumps over the lazy dog',
+    'kick': f'{MENTION} spamming',
+    'ban': f'{MENTION} spamming',
+    'unban': str(TARGET_ID),
+    'clear': '5',
+    'warn': f'{MENTION} be nice',
+    'play': 'never gonna give you up',
+    'balance': MENTION,
+    'give': f'{MENTION} 1',
+}
+
+
+def user_payload(user_id: int, name: str, bot: bool = False) -> Dict[str, Any]:
+    return {'id': str(user_id), 'username': name, 'discriminator': '0', 'global_name': None, 'avatar': None, 'bot': bot}
+
+
+def member_payload(user: Dict[str, Any], roles: List[int]) -> Dict[str, Any]:
+    return {
+        'user': user,
+        'roles': [str(role) for role in roles],
+        'joined_at': TIMESTAMP,
+        'deaf': False,
+        'mute': False,
+        'flags': 0
+    }
+
+
+def message_payload(message_id: int, channel_id: int, author: Dict[str, Any], content: str = '',
+                    embeds: Optional[list] = None, guild_id: Optional[int] = None) -> Dict[str, Any]:
+    data = {
+        'id': str(message_id),
+        'channel_id': str(channel_id),
+        'author': author,
+        'content': content,
+        'timestamp': TIMESTAMP,
+        'edited_timestamp': None,
+        'tts': False,
+        'mention_everyone': False,
+        'mentions': [],
+        'mention_roles': [],
+        'attachments': [],
+        'embeds': embeds or [],
+        'pinned': False,
+        'type': 0,
+        'flags': 0
+    }
+    if guild_id is not None:
+        data['guild_id'] = str(guild_id)
+    return data
+
+
+class OfflineGateway:
+    """Stands in for the gateway socket so bot.latency has a value"""
+
+    latency = 0.05
+    open = False
+
+
+class OfflineHTTP(HTTPClient):
+    """HTTP client that answers the REST routes the handlers use with canned payloads"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        super().__init__(loop)
+        self.requests = 0
+        self._message_ids = iter(range(900000000000000000, 10 ** 19))
+        self._bot_user = user_payload(BOT_ID, 'Benchmark', bot=True)
+
+    async def request(self, route, **kwargs):
+        self.requests += 1
+        key = (route.method, route.path)
+        if key == ('POST', '/channels/{channel_id}/messages'):
+            payload = kwargs.get('json') or {}
+            return message_payload(
+                next(self._message_ids), route.channel_id, self._bot_user,
+                payload.get('content') or '', payload.get('embeds'), GUILD_ID
+            )
+        if key == ('POST', '/users/@me/channels'):
+            recipient = kwargs['json']['recipient_id']
+            return {'id': str(recipient + 1), 'type': 1, 'recipients': [user_payload(int(recipient), 'target')]}
+        if key == ('GET', '/users/{user_id}'):
+            return user_payload(TARGET_ID, 'target')
+        if key == ('GET', '/channels/{channel_id}/messages'):
+            return []
+        if key in (
+            ('PUT', '/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me'),
+            ('DELETE', '/channels/{channel_id}/messages/{message_id}'),
+            ('POST', '/channels/{channel_id}/messages/bulk-delete'),
+            ('DELETE', '/guilds/{guild_id}/members/{user_id}'),
+            ('PUT', '/guilds/{guild_id}/bans/{user_id}'),
+            ('DELETE', '/guilds/{guild_id}/bans/{user_id}'),
+        ):
+            return None
+        raise RuntimeError(f"{route.method} {route.path} has no canned response")
+
+    async def close(self):
+        pass
+
+
+async def build_bot(manager: BotManager):
+    """Create the production bot with a populated guild cache and no network"""
+    instance = BotInstance('benchmark', 'benchmark-token')
+    bot = manager.create_bot(instance)
+    instance.bot = bot
+    await bot.__aenter__()
+    bot.http = bot._connection.http = OfflineHTTP(bot.loop)
+    bot.ws = OfflineGateway()
+    await bot.setup_hook()
+
+    state = bot._connection
+    bot_user = user_payload(BOT_ID, 'Benchmark', bot=True)
+    author = user_payload(AUTHOR_ID, 'author')
+    target = user_payload(TARGET_ID, 'target')
+    state.user = discord.ClientUser(state=state, data=bot_user)
+    everyone = {'id': str(GUILD_ID), 'name': '@everyone', 'permissions': '104324673', 'position': 0,
+                'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}
+    state._add_guild_from_data({
+        'id': str(GUILD_ID),
+        'name': 'Benchmark Guild',
+        'owner_id': str(AUTHOR_ID),
+        'member_count': 3,
+        'roles': [
+            everyone,
+            dict(everyone, id=str(MODERATOR_ROLE_ID), name='Moderator', permissions='8', position=2),
+            dict(everyone, id=str(MEMBER_ROLE_ID), name='Member', position=1),
+        ],
+        'channels': [
+            {'id': str(CHANNEL_ID), 'type': 0, 'name': 'general', 'position': 0, 'permission_overwrites': []},
+            {'id': str(VOICE_CHANNEL_ID), 'type': 2, 'name': 'voice', 'position': 1, 'permission_overwrites': [],
+             'bitrate': 64000, 'user_limit': 0},
+        ],
+        'members': [
+            member_payload(bot_user, [MODERATOR_ROLE_ID]),
+            member_payload(author, [MODERATOR_ROLE_ID]),
+            member_payload(target, [MEMBER_ROLE_ID]),
+        ]
+    })
+    return bot
+
+
+def make_message(bot, content: str, message_id: int) -> discord.Message:
+    author = user_payload(AUTHOR_ID, 'author')
+    data = message_payload(message_id, CHANNEL_ID, author, content, guild_id=GUILD_ID)
+    data['member'] = member_payload(author, [MODERATOR_ROLE_ID])
+    return discord.Message(state=bot._connection, channel=bot.get_channel(CHANNEL_ID), data=data)
+
+
+async def invoke(bot, message: discord.Message):
+    """Run one command the way on_message does, raising whatever the command raised"""
+    ctx = await bot.get_context(message, cls=QueuedContext)
+    await ctx.command.invoke(ctx)
+
+
+async def measure(bot, message: discord.Message, min_time: float, warmup: int, alloc_runs: int) -> Dict[str, Any]:
+    """Time one command and measure what it allocates"""
+    for _ in range(warmup):
+        await invoke(bot, message)
+
+    durations = []
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(durations) < 10:
+        started = time.perf_counter_ns()
+        await invoke(bot, message)
+        durations.append(time.perf_counter_ns() - started)
+
+    tracemalloc.start()
+    try:
+        peaks = []
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(alloc_runs):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await invoke(bot, message)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'ns_per_op': int(statistics.median(durations)),
+        'mean_ns': int(statistics.fmean(durations)),
+        'iterations': len(durations),
+        'peak_alloc_bytes': int(statistics.median(peaks)),
+        'retained_bytes': max((after - before) // alloc_runs, 0)
+    }
+
+
+async def run(names: List[str], min_time: float, warmup: int, alloc_runs: int) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix='bench-commands-')
+    os.environ['ECONOMY_DB'] = os.path.join(workdir, 'economy.db')
+    os.environ['REMINDERS_PATH'] = os.path.join(workdir, 'reminders')
+    manager = BotManager()
+    bot = await build_bot(manager)
+    results = {}
+    # Deliberate pauses (!clear waits before deleting its reply) are not handler cost
+    real_sleep = asyncio.sleep
+
+    async def yield_once(delay, result=None):
+        return await real_sleep(0, result)
+
+    asyncio.sleep = yield_once
+    try:
+        for index, name in enumerate(names):
+            content = f"!{name} {ARGUMENTS.get(name, '')}".rstrip()
+            message = make_message(bot, content, 810000000000000000 + index)
+            random.seed(0)
+            try:
+                results[name] = await measure(bot, message, min_time, warmup, alloc_runs)
+            except Exception as e:
+                results[name] = {'error': f"{type(e).__name__}: {e}"}
+            results[name]['command'] = content
+    finally:
+        asyncio.sleep = real_sleep
+        await bot.close()
+        # Release everything before the temporary files go away, so nothing is left to save at exit
+        manager.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """List the commands that got slower or allocate more than `threshold` times the baseline"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or 'error' in before or 'error' in result:
+            continue
+        for metric in ('ns_per_op', 'peak_alloc_bytes'):
+            if before[metric] and result[metric] > before[metric] * threshold:
+                regressions.append(
+                    f"{name}: {metric} {before[metric]} -> {result[metric]} ({result[metric] / before[metric]:.2f}x)"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('commands', nargs='*', help="Command names to run (default: every command)")
+    parser.add_argument('--tracked', action='store_true', help=f"Only run {', '.join(TRACKED)}")
+    parser.add_argument('--min-time', type=float, default=0.3, help="Seconds to time each command for")
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--alloc-runs', type=int, default=20, help="Invocations traced for allocations")
+    parser.add_argument('--save', help="Write the results to this JSON file")
+    parser.add_argument('--baseline', help="Fail when a command regresses against this results file")
+    parser.add_argument('--threshold', type=float, default=1.25, help="Allowed slowdown/growth factor")
+    args = parser.parse_args(argv)
+
+    available = [command.name for command in get_catalog().commands]
+    names = args.commands or (list(TRACKED) if args.tracked else available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        parser.error(f"Unknown commands: {', '.join(unknown)}")
+
+    results = asyncio.run(run(names, args.min_time, args.warmup, args.alloc_runs))
+
+    print(f"{'command':<12} {'µs/op':>10} {'peak KiB':>10} {'retained B':>11}")
+    for name, result in results.items():
+        marker = '*' if name in TRACKED else ' '
+        if 'error' in result:
+            print(f"{name:<11}{marker} {result['error']}")
+            continue
+        print(f"{name:<11}{marker} {result['ns_per_op'] / 1000:>10.1f} "
+              f"{result['peak_alloc_bytes'] / 1024:>10.1f} {result['retained_bytes']:>11}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'discord.py': discord.__version__,
+                'commands': results
+            }, f, indent=2)
+
+    failed = any('error' in result for result in results.values())
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['commands'], args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
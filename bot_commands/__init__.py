@@ -0,0 +1,15 @@
+# Command handlers, one module per `!help` category.
+# Handlers are plain coroutines taking the invocation Context; catalog.json maps
+# command names to them and catalog.py turns them into Command objects that are
+# shared by every bot in the process.
+#
+# The package is also the discord.py extension that puts those commands on a bot,
+# so BotManager can swap in reloaded handlers with `bot.reload_extension`.
+from catalog import get_catalog
+
+
+async def setup(bot):
+    """Register the current catalog's commands on a bot"""
+    # On unload discord.py drops every command whose callback lives in this
+    # package, so no teardown is needed
+    get_catalog().attach(bot)
@@ -0,0 +1,75 @@
+import discord
+from content import get_registry
+
+
+async def ping_command(ctx):
+    """Check if the bot is responsive"""
+    latency = round(ctx.bot.latency * 1000)
+    embed = discord.Embed(
+        title="🏓 Pong!",
+        description=f"Bot latency: {latency}ms",
+        color=0x00ff00
+    )
+    await ctx.send(embed=embed)
+
+
+async def help_command(ctx, category=None):
+    """Show available commands"""
+    await ctx.send(embed=get_registry().help(category))
+
+
+async def info_command(ctx):
+    """Show bot information"""
+    embed = discord.Embed(
+        title="🤖 Bot Information",
+        color=0x9932cc
+    )
+    embed.add_field(name="Bot Name", value=ctx.bot.user.name, inline=True)
+    embed.add_field(name="Bot ID", value=ctx.bot.user.id, inline=True)
+    embed.add_field(name="Servers", value=len(ctx.bot.guilds), inline=True)
+    
+    total_users = sum(guild.member_count for guild in ctx.bot.guilds if guild.member_count)
+    embed.add_field(name="Total Users", value=total_users, inline=True)
+    embed.add_field(name="Latency", value=f"{round(ctx.bot.latency * 1000)}ms", inline=True)
+    embed.add_field(name="Discord.py Version", value=discord.__version__, inline=True)
+    
+    embed.set_thumbnail(url=ctx.bot.user.avatar.url if ctx.bot.user.avatar else ctx.bot.user.default_avatar.url)
+    embed.set_footer(text="Powered by Discord Bot Runner")
+    await ctx.send(embed=embed)
+
+
+async def server_command(ctx):
+    """Show server information"""
+    guild = ctx.guild
+    if not guild:
+        await ctx.send("This command can only be used in a server!")
+        return
+    
+    embed = discord.Embed(
+        title=f"🏠 {guild.name}",
+        description="Server Information",
+        color=0xff6b35
+    )
+    embed.add_field(name="Server ID", value=guild.id, inline=True)
+    embed.add_field(name="Owner", value=guild.owner.mention if guild.owner else "Unknown", inline=True)
+    embed.add_field(name="Members", value=guild.member_count, inline=True)
+    embed.add_field(name="Text Channels", value=len(guild.text_channels), inline=True)
+    embed.add_field(name="Voice Channels", value=len(guild.voice_channels), inline=True)
+    embed.add_field(name="Created", value=guild.created_at.strftime("%B %d, %Y"), inline=True)
+    
+    if guild.icon:
+        embed.set_thumbnail(url=guild.icon.url)
+    
+    await ctx.send(embed=embed)
+
+
+async def avatar_command(ctx, member: discord.Member = None):
+    """Show user's avatar"""
+    target = member or ctx.author
+    embed = discord.Embed(
+        title=f"🖼️ {target.display_name}'s Avatar",
+        color=target.color
+    )
+    embed.set_image(url=target.display_avatar.url)
+    await ctx.send(embed=embed)
+
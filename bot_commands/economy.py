@@ -0,0 +1,89 @@
+import random
+import datetime
+import discord
+
+
+async def balance_command(ctx, member: discord.Member = None):
+    """Check coin balance"""
+    target = member or ctx.author
+    economy = ctx.bot.manager.get_economy()
+    await economy.prefetch(ctx.bot.instance.bot_id, target.id)
+    balance = economy.balance(ctx.bot.instance.bot_id, target.id)
+    
+    embed = discord.Embed(
+        title="💰 Coin Balance",
+        description=f"{target.mention} has **{balance}** coins!",
+        color=0xffd700
+    )
+    await ctx.send(embed=embed)
+
+
+async def daily_command(ctx):
+    """Claim daily coins"""
+    today = datetime.datetime.now().date()
+    reward = random.randint(50, 200)
+    economy = ctx.bot.manager.get_economy()
+    await economy.prefetch(ctx.bot.instance.bot_id, ctx.author.id)
+    claimed, balance = economy.claim_daily(ctx.bot.instance.bot_id, ctx.author.id, today, reward)
+    
+    if not claimed:
+        embed = discord.Embed(
+            title="💰 Daily Reward",
+            description="You've already claimed your daily reward today! Come back tomorrow.",
+            color=0xff0000
+        )
+        await ctx.send(embed=embed)
+        return
+    
+    embed = discord.Embed(
+        title="💰 Daily Reward Claimed!",
+        description=f"You received **{reward}** coins!\nNew balance: **{balance}** coins",
+        color=0x00ff00
+    )
+    await ctx.send(embed=embed)
+
+
+async def give_command(ctx, member: discord.Member = None, amount: int = None):
+    """Give coins to another user"""
+    if not member or not amount:
+        await ctx.send("Usage: `!give @user <amount>`")
+        return
+    
+    if amount <= 0:
+        await ctx.send("Amount must be positive!")
+        return
+    
+    if member == ctx.author:
+        await ctx.send("You can't give coins to yourself!")
+        return
+    
+    economy = ctx.bot.manager.get_economy()
+    await economy.prefetch(ctx.bot.instance.bot_id, ctx.author.id, member.id)
+    if not economy.transfer(ctx.bot.instance.bot_id, ctx.author.id, member.id, amount):
+        await ctx.send("You don't have enough coins!")
+        return
+    
+    embed = discord.Embed(
+        title="💰 Coins Transferred",
+        description=f"{ctx.author.mention} gave **{amount}** coins to {member.mention}!",
+        color=0x00ff00
+    )
+    await ctx.send(embed=embed)
+
+
+async def shop_command(ctx):
+    """View the coin shop"""
+    economy = ctx.bot.manager.get_economy()
+    await economy.prefetch(ctx.bot.instance.bot_id, ctx.author.id)
+    embed = discord.Embed(
+        title="🛒 Coin Shop",
+        description="Welcome to the coin shop! (Demo)",
+        color=0x9932cc
+    )
+    embed.add_field(name="🎭 Custom Role", value="500 coins", inline=True)
+    embed.add_field(name="🏆 VIP Status", value="1000 coins", inline=True)
+    embed.add_field(name="🌟 Special Badge", value="750 coins", inline=True)
+    embed.add_field(name="Your Balance", value=f"{economy.balance(ctx.bot.instance.bot_id, ctx.author.id)} coins", inline=False)
+    embed.set_footer(text="🎉 Tienda premium disponible GRATIS durante mantenimiento!")
+    await ctx.send(embed=embed)
+
@@ -0,0 +1,42 @@
+import random
+import discord
+from content import get_registry
+
+
+async def joke_command(ctx):
+    """Get a random joke"""
+    await ctx.send(embed=get_registry().random_joke())
+
+
+async def fact_command(ctx):
+    """Get a random fact"""
+    await ctx.send(embed=get_registry().random_fact())
+
+
+async def quote_command(ctx):
+    """Get an inspirational quote"""
+    await ctx.send(embed=get_registry().random_quote())
+
+
+async def roast_command(ctx, member: discord.Member = None):
+    """Roast someone (friendly)"""
+    target = member or ctx.author
+    embed = discord.Embed(
+        title="🔥 Friendly Roast",
+        description=random.choice(get_registry().roasts).format(mention=target.mention),
+        color=0xff4500
+    )
+    embed.set_footer(text="Just kidding! You're awesome! 😄")
+    await ctx.send(embed=embed)
+
+
+async def compliment_command(ctx, member: discord.Member = None):
+    """Give a compliment"""
+    target = member or ctx.author
+    embed = discord.Embed(
+        title="💝 Compliment",
+        description=random.choice(get_registry().compliments).format(mention=target.mention),
+        color=0x00ff00
+    )
+    await ctx.send(embed=embed)
+
@@ -0,0 +1,127 @@
+import random
+import discord
+from content import get_registry
+
+
+async def rps_command(ctx, choice=None):
+    """Rock, Paper, Scissors game"""
+    if not choice:
+        embed = discord.Embed(
+            title="✋ Rock Paper Scissors",
+            description="Usage: `!rps <rock/paper/scissors>`",
+            color=0xff0000
+        )
+        await ctx.send(embed=embed)
+        return
+    
+    choice = choice.lower()
+    if choice not in ['rock', 'paper', 'scissors']:
+        await ctx.send("Choose rock, paper, or scissors!")
+        return
+    
+    bot_choice = random.choice(['rock', 'paper', 'scissors'])
+    
+    if choice == bot_choice:
+        result = "It's a tie!"
+        color = 0xffff00
+    elif (choice == 'rock' and bot_choice == 'scissors') or \
+         (choice == 'paper' and bot_choice == 'rock') or \
+         (choice == 'scissors' and bot_choice == 'paper'):
+        result = "You win! 🎉"
+        color = 0x00ff00
+    else:
+        result = "I win! 😄"
+        color = 0xff0000
+    
+    embed = discord.Embed(
+        title="✋ Rock Paper Scissors",
+        description=f"You: {choice.title()}\nMe: {bot_choice.title()}\n\n{result}",
+        color=color
+    )
+    await ctx.send(embed=embed)
+
+
+async def dice_command(ctx, sides: int = 6):
+    """Roll a dice"""
+    if sides < 2 or sides > 100:
+        await ctx.send("Dice must have between 2 and 100 sides!")
+        return
+    
+    result = random.randint(1, sides)
+    embed = discord.Embed(
+        title="🎲 Dice Roll",
+        description=f"You rolled a {result} on a {sides}-sided dice!",
+        color=0x9932cc
+    )
+    await ctx.send(embed=embed)
+
+
+async def coinflip_command(ctx):
+    """Flip a coin"""
+    result = random.choice(['Heads', 'Tails'])
+    emoji = '🪙' if result == 'Heads' else '🥈'
+    embed = discord.Embed(
+        title=f"{emoji} Coin Flip",
+        description=f"The coin landed on **{result}**!",
+        color=0xffd700
+    )
+    await ctx.send(embed=embed)
+
+
+async def eight_ball_command(ctx, *, question=None):
+    """Magic 8-ball answers"""
+    if not question:
+        await ctx.send("Ask me a question! Usage: `!8ball <question>`")
+        return
+    
+    embed = discord.Embed(
+        title="🎱 Magic 8-Ball",
+        description=f"**Question:** {question}\n**Answer:** {random.choice(get_registry().eight_ball_responses)}",
+        color=0x000000
+    )
+    await ctx.send(embed=embed)
+
+
+async def trivia_command(ctx):
+    """Random trivia question"""
+    await ctx.send(embed=get_registry().random_trivia())
+
+
+async def hangman_command(ctx):
+    """Play hangman"""
+    word = random.choice(get_registry().hangman_words).upper()
+    guessed = ["_"] * len(word)
+    
+    embed = discord.Embed(
+        title="🎮 Hangman Game",
+        description=f"Word: {' '.join(guessed)}\nTries left: 6\n\nGuess letters by typing them!",
+        color=0x9932cc
+    )
+    embed.set_footer(text=f"Answer: {word} - This is a simplified demo version!")
+    await ctx.send(embed=embed)
+
+
+async def wordguess_command(ctx):
+    """Guess the scrambled word"""
+    word, scrambled = random.choice(get_registry().scrambled_words)
+    
+    embed = discord.Embed(
+        title="🔤 Word Scramble",
+        description=f"Unscramble this word: **{scrambled}**",
+        color=0xff6347
+    )
+    embed.set_footer(text=f"Answer: {word}")
+    await ctx.send(embed=embed)
+
+
+async def numguess_command(ctx):
+    """Number guessing game"""
+    number = random.randint(1, 100)
+    embed = discord.Embed(
+        title="🔢 Number Guessing Game",
+        description="I'm thinking of a number between 1 and 100!\nTry to guess it!",
+        color=0x32cd32
+    )
+    embed.set_footer(text=f"The number was: {number}")
+    await ctx.send(embed=embed)
+
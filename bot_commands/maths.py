@@ -0,0 +1,83 @@
+import discord
+from calculator import CalcError
+
+
+async def calc_command(ctx, *, expression=None):
+    """Calculate math expressions"""
+    if not expression:
+        await ctx.send("Usage: `!calc <expression>`\nExample: `!calc 2 + 2 * 3`")
+        return
+    
+    try:
+        # Evaluated in a worker process with size limits and a time budget
+        result = await ctx.bot.manager.get_calculator().calculate(expression)
+    except CalcError as e:
+        await ctx.send(str(e))
+        return
+    
+    embed = discord.Embed(
+        title="🧮 Calculator",
+        description=f"**Expression:** {expression.replace('^', '**')}\n**Result:** {result}",
+        color=0x32cd32
+    )
+    await ctx.send(embed=embed)
+
+
+async def convert_command(ctx, value=None, from_unit=None, to_unit=None):
+    """Unit conversion (basic)"""
+    if not all([value, from_unit, to_unit]):
+        await ctx.send("Usage: `!convert <value> <from_unit> <to_unit>`\nExample: `!convert 100 cm m`")
+        return
+    
+    try:
+        val = float(value)
+    except:
+        await ctx.send("Invalid number!")
+        return
+    
+    # Simple conversions
+    conversions = {
+        ("cm", "m"): 0.01,
+        ("m", "cm"): 100,
+        ("kg", "lb"): 2.20462,
+        ("lb", "kg"): 0.453592,
+        ("c", "f"): lambda x: x * 9/5 + 32,
+        ("f", "c"): lambda x: (x - 32) * 5/9
+    }
+    
+    key = (from_unit.lower(), to_unit.lower())
+    if key in conversions:
+        factor = conversions[key]
+        if callable(factor):
+            result = factor(val)
+        else:
+            result = val * factor
+        
+        embed = discord.Embed(
+            title="🔄 Unit Converter",
+            description=f"**{val} {from_unit}** = **{result:.2f} {to_unit}**",
+            color=0x32cd32
+        )
+        await ctx.send(embed=embed)
+    else:
+        await ctx.send("Conversion not supported! Try: cm↔m, kg↔lb, c↔f")
+
+
+async def fibonacci_command(ctx, n: int = None):
+    """Generate fibonacci sequence"""
+    if not n or n <= 0 or n > 20:
+        await ctx.send("Please provide a number between 1 and 20!")
+        return
+    
+    fib = [0, 1]
+    for i in range(2, n):
+        fib.append(fib[i-1] + fib[i-2])
+    
+    sequence = ', '.join(map(str, fib[:n]))
+    embed = discord.Embed(
+        title="🔢 Fibonacci Sequence",
+        description=f"First {n} numbers: {sequence}",
+        color=0xffd700
+    )
+    await ctx.send(embed=embed)
+
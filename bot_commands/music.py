@@ -0,0 +1,35 @@
+import discord
+from content import PREMIUM_FOOTER, get_registry
+
+
+async def play_command(ctx, *, song=None):
+    """Play music (Demo)"""
+    if not song:
+        await ctx.send("Please specify a song to play!")
+        return
+    
+    embed = discord.Embed(
+        title="🎵 Now Playing (Demo)",
+        description=f"**{song}**",
+        color=0x1db954
+    )
+    embed.add_field(name="Duration", value="3:45", inline=True)
+    embed.add_field(name="Requested by", value=ctx.author.mention, inline=True)
+    embed.set_footer(text=PREMIUM_FOOTER)
+    await ctx.send(embed=embed)
+
+
+async def pause_command(ctx):
+    """Pause music (Demo)"""
+    await ctx.send(embed=get_registry().music_paused)
+
+
+async def stop_command(ctx):
+    """Stop music (Demo)"""
+    await ctx.send(embed=get_registry().music_stopped)
+
+
+async def queue_command(ctx):
+    """Show music queue (Demo)"""
+    await ctx.send(embed=get_registry().music_queue)
+
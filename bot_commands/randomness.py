@@ -0,0 +1,62 @@
+import random
+import discord
+from content import get_registry
+
+
+async def random_command(ctx, min_val: int = 1, max_val: int = 100):
+    """Generate random number"""
+    if min_val >= max_val:
+        await ctx.send("Minimum value must be less than maximum!")
+        return
+    
+    result = random.randint(min_val, max_val)
+    embed = discord.Embed(
+        title="🎲 Random Number",
+        description=f"Random number between {min_val} and {max_val}: **{result}**",
+        color=0x9932cc
+    )
+    await ctx.send(embed=embed)
+
+
+async def choose_command(ctx, *choices):
+    """Choose from multiple options"""
+    if len(choices) < 2:
+        await ctx.send("Give me at least 2 options to choose from!")
+        return
+    
+    choice = random.choice(choices)
+    embed = discord.Embed(
+        title="🎯 Choice Made",
+        description=f"I choose: **{choice}**",
+        color=0xff6347
+    )
+    embed.add_field(name="Options were", value=", ".join(choices), inline=False)
+    await ctx.send(embed=embed)
+
+
+async def color_command(ctx):
+    """Generate random color"""
+    r = random.randint(0, 255)
+    g = random.randint(0, 255)
+    b = random.randint(0, 255)
+    hex_color = f"#{r:02x}{g:02x}{b:02x}"
+    
+    embed = discord.Embed(
+        title="🎨 Random Color",
+        description=f"**Hex:** {hex_color}\n**RGB:** ({r}, {g}, {b})",
+        color=int(hex_color[1:], 16)
+    )
+    await ctx.send(embed=embed)
+
+
+async def name_command(ctx):
+    """Generate random name"""
+    content = get_registry()
+    name = f"{random.choice(content.first_names)} {random.choice(content.last_names)}"
+    embed = discord.Embed(
+        title="📝 Random Name",
+        description=f"Generated name: **{name}**",
+        color=0xdda0dd
+    )
+    await ctx.send(embed=embed)
+
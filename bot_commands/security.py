@@ -0,0 +1,124 @@
+import asyncio
+import discord
+from discord.ext import commands
+
+
+@commands.has_permissions(kick_members=True)
+async def kick_command(ctx, member: discord.Member = None, *, reason="No reason provided"):
+    """Kick a user from the server"""
+    if not member:
+        await ctx.send("Please specify a user to kick!")
+        return
+    
+    if member.top_role >= ctx.author.top_role:
+        await ctx.send("You cannot kick someone with a higher or equal role!")
+        return
+    
+    try:
+        await member.kick(reason=reason)
+        embed = discord.Embed(
+            title="👢 User Kicked",
+            description=f"{member.mention} has been kicked from the server.",
+            color=0xff6b35
+        )
+        embed.add_field(name="Reason", value=reason, inline=False)
+        embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+        await ctx.send(embed=embed)
+    except discord.Forbidden:
+        await ctx.send("I don't have permission to kick this user!")
+
+
+@commands.has_permissions(ban_members=True)
+async def ban_command(ctx, member: discord.Member = None, *, reason="No reason provided"):
+    """Ban a user from the server"""
+    if not member:
+        await ctx.send("Please specify a user to ban!")
+        return
+    
+    if member.top_role >= ctx.author.top_role:
+        await ctx.send("You cannot ban someone with a higher or equal role!")
+        return
+    
+    try:
+        await member.ban(reason=reason)
+        embed = discord.Embed(
+            title="🔨 User Banned",
+            description=f"{member.mention} has been banned from the server.",
+            color=0xff0000
+        )
+        embed.add_field(name="Reason", value=reason, inline=False)
+        embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+        await ctx.send(embed=embed)
+    except discord.Forbidden:
+        await ctx.send("I don't have permission to ban this user!")
+
+
+@commands.has_permissions(ban_members=True)
+async def unban_command(ctx, user_id: int = None):
+    """Unban a user from the server"""
+    if not user_id:
+        await ctx.send("Please provide a user ID to unban!")
+        return
+    
+    try:
+        user = await ctx.bot.fetch_user(user_id)
+        await ctx.guild.unban(user)
+        embed = discord.Embed(
+            title="✅ User Unbanned",
+            description=f"{user.mention} has been unbanned from the server.",
+            color=0x00ff00
+        )
+        embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+        await ctx.send(embed=embed)
+    except:
+        await ctx.send("Could not unban that user!")
+
+
+@commands.has_permissions(manage_messages=True)
+async def clear_command(ctx, amount: int = None):
+    """Clear messages from the channel"""
+    if not amount or amount <= 0 or amount > 100:
+        await ctx.send("Please specify a number between 1 and 100!")
+        return
+    
+    deleted = await ctx.channel.purge(limit=amount + 1)
+    embed = discord.Embed(
+        title="🧹 Messages Cleared",
+        description=f"Deleted {len(deleted) - 1} messages from {ctx.channel.mention}",
+        color=0x00ff00
+    )
+    embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+    
+    # Deleted below, so it must not be merged with other replies
+    msg = await ctx.send(embed=embed, coalesce=False)
+    await asyncio.sleep(5)
+    await msg.delete()
+
+
+@commands.has_permissions(manage_messages=True)
+async def warn_command(ctx, member: discord.Member = None, *, reason="No reason provided"):
+    """Warn a user"""
+    if not member:
+        await ctx.send("Please specify a user to warn!")
+        return
+    
+    embed = discord.Embed(
+        title="⚠️ User Warning",
+        description=f"{member.mention} has been warned.",
+        color=0xffa500
+    )
+    embed.add_field(name="Reason", value=reason, inline=False)
+    embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+    await ctx.send(embed=embed)
+    
+    try:
+        dm_embed = discord.Embed(
+            title="⚠️ Warning",
+            description=f"You have been warned in {ctx.guild.name}",
+            color=0xffa500
+        )
+        dm_embed.add_field(name="Reason", value=reason, inline=False)
+        await member.send(embed=dm_embed)
+    except:
+        pass
+
@@ -0,0 +1,64 @@
+import discord
+
+
+async def reverse_command(ctx, *, text=None):
+    """Reverse text"""
+    if not text:
+        await ctx.send("Usage: `!reverse <text>`")
+        return
+    
+    reversed_text = text[::-1]
+    embed = discord.Embed(
+        title="🔄 Text Reverser",
+        description=f"**Original:** {text}\n**Reversed:** {reversed_text}",
+        color=0x40e0d0
+    )
+    await ctx.send(embed=embed)
+
+
+async def upper_command(ctx, *, text=None):
+    """Convert to uppercase"""
+    if not text:
+        await ctx.send("Usage: `!upper <text>`")
+        return
+    
+    embed = discord.Embed(
+        title="🔠 Uppercase",
+        description=f"**Original:** {text}\n**Uppercase:** {text.upper()}",
+        color=0xff7f50
+    )
+    await ctx.send(embed=embed)
+
+
+async def lower_command(ctx, *, text=None):
+    """Convert to lowercase"""
+    if not text:
+        await ctx.send("Usage: `!lower <text>`")
+        return
+    
+    embed = discord.Embed(
+        title="🔡 Lowercase",
+        description=f"**Original:** {text}\n**Lowercase:** {text.lower()}",
+        color=0x98fb98
+    )
+    await ctx.send(embed=embed)
+
+
+async def count_command(ctx, *, text=None):
+    """Count characters and words"""
+    if not text:
+        await ctx.send("Usage: `!count <text>`")
+        return
+    
+    char_count = len(text)
+    word_count = len(text.split())
+    
+    embed = discord.Embed(
+        title="📊 Text Counter",
+        description=f"**Text:** {text}",
+        color=0xdda0dd
+    )
+    embed.add_field(name="Characters", value=char_count, inline=True)
+    embed.add_field(name="Words", value=word_count, inline=True)
+    await ctx.send(embed=embed)
+
@@ -0,0 +1,82 @@
+import random
+import string
+import base64
+import discord
+
+
+async def shorten_command(ctx, url=None):
+    """Create short URL (placeholder)"""
+    if not url:
+        await ctx.send("Usage: `!shorten <url>`")
+        return
+    
+    short_id = ''.join(random.choices('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=6))
+    
+    embed = discord.Embed(
+        title="🔗 URL Shortener",
+        description=f"**Original:** {url}\n**Shortened:** https://short.ly/{short_id}",
+        color=0x0099ff
+    )
+    embed.set_footer(text="🎉 Acortador de URLs premium disponible GRATIS durante mantenimiento!")
+    await ctx.send(embed=embed)
+
+
+async def password_command(ctx, length: int = 12):
+    """Generate secure password"""
+    if length < 4 or length > 50:
+        await ctx.send("Password length must be between 4 and 50 characters!")
+        return
+    
+    chars = string.ascii_letters + string.digits + "!@#$%^&*"
+    password = ''.join(random.choice(chars) for _ in range(length))
+    
+    embed = discord.Embed(
+        title="🔐 Password Generator",
+        description=f"Generated password: `{password}`",
+        color=0xff6b6b
+    )
+    embed.set_footer(text="Keep this password safe!")
+    await ctx.send(embed=embed)
+
+
+async def qr_command(ctx, *, text=None):
+    """Generate QR code (placeholder)"""
+    if not text:
+        await ctx.send("Usage: `!qr <text>`")
+        return
+    
+    embed = discord.Embed(
+        title="📱 QR Code Generator",
+        description=f"QR code for: **{text}**\n\n(Real QR generation requires additional libraries)",
+        color=0x000000
+    )
+    embed.set_footer(text="🎉 Generador QR premium disponible GRATIS durante mantenimiento!")
+    await ctx.send(embed=embed)
+
+
+async def base64_command(ctx, operation=None, *, text=None):
+    """Base64 encode/decode"""
+    if not operation or not text:
+        await ctx.send("Usage: `!base64 <encode/decode> <text>`")
+        return
+    
+    try:
+        if operation.lower() == 'encode':
+            result = base64.b64encode(text.encode()).decode()
+            title = "📤 Base64 Encode"
+        elif operation.lower() == 'decode':
+            result = base64.b64decode(text.encode()).decode()
+            title = "📥 Base64 Decode"
+        else:
+            await ctx.send("Operation must be 'encode' or 'decode'!")
+            return
+        
+        embed = discord.Embed(
+            title=title,
+            description=f"**Input:** {text}\n**Output:** {result}",
+            color=0x6495ed
+        )
+        await ctx.send(embed=embed)
+    except:
+        await ctx.send("Invalid input for base64 operation!")
+
@@ -0,0 +1,42 @@
+import discord
+
+
+async def userinfo_command(ctx, member: discord.Member = None):
+    """Get user information"""
+    target = member or ctx.author
+    embed = discord.Embed(
+        title=f"👤 User Info: {target.display_name}",
+        color=target.color
+    )
+    embed.set_thumbnail(url=target.display_avatar.url)
+    embed.add_field(name="Username", value=target.name, inline=True)
+    embed.add_field(name="Discriminator", value=f"#{target.discriminator}", inline=True)
+    embed.add_field(name="ID", value=target.id, inline=True)
+    embed.add_field(name="Status", value=str(target.status).title(), inline=True)
+    embed.add_field(name="Highest Role", value=target.top_role.mention, inline=True)
+    embed.add_field(name="Joined Server", value=target.joined_at.strftime("%B %d, %Y"), inline=True)
+    embed.add_field(name="Account Created", value=target.created_at.strftime("%B %d, %Y"), inline=True)
+    await ctx.send(embed=embed)
+
+
+async def joined_command(ctx, member: discord.Member = None):
+    """When user joined server"""
+    target = member or ctx.author
+    embed = discord.Embed(
+        title="📅 Join Date",
+        description=f"{target.mention} joined on {target.joined_at.strftime('%B %d, %Y at %I:%M %p')}",
+        color=0x00ff00
+    )
+    await ctx.send(embed=embed)
+
+
+async def created_command(ctx, member: discord.Member = None):
+    """When user created account"""
+    target = member or ctx.author
+    embed = discord.Embed(
+        title="🎂 Account Creation",
+        description=f"{target.mention}'s account was created on {target.created_at.strftime('%B %d, %Y at %I:%M %p')}",
+        color=0x0099ff
+    )
+    await ctx.send(embed=embed)
+
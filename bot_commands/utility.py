@@ -0,0 +1,95 @@
+import re
+import discord
+
+
+async def poll_command(ctx, *, question=None):
+    """Create a yes/no poll"""
+    if not question:
+        await ctx.send("Usage: `!poll <question>`")
+        return
+    
+    embed = discord.Embed(
+        title="📊 Poll",
+        description=question,
+        color=0x0099ff
+    )
+    embed.set_footer(text=f"Poll created by {ctx.author.display_name}")
+    
+    # Reacted to below, so it must not be merged with other replies
+    message = await ctx.send(embed=embed, coalesce=False)
+    # Vote reactions are decorative, so they queue behind other replies
+    await ctx.add_reactions(message, '👍', '👎')
+
+
+async def timer_command(ctx, seconds: int = None):
+    """Set a timer"""
+    if not seconds or seconds <= 0 or seconds > 3600:
+        await ctx.send("Set a timer between 1 and 3600 seconds! Usage: `!timer <seconds>`")
+        return
+    
+    embed = discord.Embed(
+        title="⏰ Timer Started",
+        description=f"Timer set for {seconds} seconds!",
+        color=0xff9900
+    )
+    await ctx.send(embed=embed)
+    
+    ctx.bot.manager.get_scheduler().schedule(ctx.bot.instance.bot_id, ctx.channel.id, ctx.author.id, seconds, 'timer', str(seconds))
+
+
+async def remind_command(ctx, time_str=None, *, message=None):
+    """Set a reminder"""
+    if not time_str or not message:
+        await ctx.send("Usage: `!remind <time> <message>`\nExample: `!remind 5m Take a break`")
+        return
+    
+    # Parse time string
+    time_match = re.match(r'(\d+)([smhd])', time_str.lower())
+    if not time_match:
+        await ctx.send("Invalid time format! Use: 5s, 10m, 2h, 1d")
+        return
+    
+    amount = int(time_match.group(1))
+    unit = time_match.group(2)
+    
+    if unit == 's':
+        seconds = amount
+    elif unit == 'm':
+        seconds = amount * 60
+    elif unit == 'h':
+        seconds = amount * 3600
+    elif unit == 'd':
+        seconds = amount * 86400
+    
+    if seconds > 86400 * 7:  # Max 1 week
+        await ctx.send("Maximum reminder time is 7 days!")
+        return
+    
+    embed = discord.Embed(
+        title="⏰ Reminder Set",
+        description=f"I'll remind you in {time_str}: {message}",
+        color=0xff9900
+    )
+    await ctx.send(embed=embed)
+    
+    ctx.bot.manager.get_scheduler().schedule(ctx.bot.instance.bot_id, ctx.channel.id, ctx.author.id, seconds, 'remind', message)
+
+
+async def weather_command(ctx, *, city=None):
+    """Get weather info (placeholder)"""
+    if not city:
+        await ctx.send("Usage: `!weather <city>`")
+        return
+    
+    # This is a placeholder - in a real bot you'd use a weather API
+    embed = discord.Embed(
+        title=f"🌤️ Weather in {city.title()}",
+        description="Weather API integration needed for real data.\nThis is a demo bot!",
+        color=0x87ceeb
+    )
+    embed.add_field(name="Temperature", value="22°C / 72°F", inline=True)
+    embed.add_field(name="Condition", value="Partly Cloudy", inline=True)
+    embed.add_field(name="Humidity", value="65%", inline=True)
+    embed.set_footer(text="Demo data - not real weather!")
+    await ctx.send(embed=embed)
+
@@ -0,0 +1,15 @@
+import base64
+import hashlib
+
+
+def bot_id_from_token(token: str) -> str:
+    """Derive a stable bot ID from a token without contacting Discord"""
+    # The first segment of a bot token is the base64-encoded application ID
+    first = token.strip().split('.')[0]
+    try:
+        decoded = base64.b64decode(first + '=' * (-len(first) % 4)).decode()
+        if decoded.isdigit():
+            return decoded
+    except Exception:
+        pass
+    return hashlib.sha256(token.strip().encode()).hexdigest()[:16]
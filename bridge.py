@@ -0,0 +1,39 @@
+import asyncio
+from concurrent.futures import Future
+from typing import Callable
+
+
+class LoopBridge:
+    """Thread-safe command queue into the bot event loop with awaitable results"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run `fn` on the loop thread; coroutines it returns are awaited there too"""
+        future = Future()
+
+        def resolve(task: asyncio.Future):
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+        def execute():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                return
+            if asyncio.iscoroutine(result):
+                self.loop.create_task(result).add_done_callback(resolve)
+            else:
+                future.set_result(result)
+
+        # The loop's ready queue is the command queue: commands run in submission order
+        self.loop.call_soon_threadsafe(execute)
+        return future
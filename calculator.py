@@ -0,0 +1,179 @@
+import ast
+import asyncio
+import operator
+import threading
+import multiprocessing
+from collections import OrderedDict
+from functools import lru_cache
+
+MAX_EXPRESSION_LENGTH = 200
+MAX_EXPONENT = 1000
+MAX_INT_BITS = 4096
+MAX_RESULT_LENGTH = 1000
+ALLOWED_CHARS = frozenset('0123456789+-*/().^ ')
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+class CalcError(Exception):
+    """Raised for expressions that can't (or shouldn't) be evaluated"""
+
+
+def normalize(expression: str) -> str:
+    """Validate the characters of an expression and convert it to Python syntax"""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise CalcError(f"Expression is too long! (max {MAX_EXPRESSION_LENGTH} characters)")
+    if not ALLOWED_CHARS.issuperset(expression):
+        raise CalcError("Invalid characters in expression!")
+    # Replace ^ with ** for power
+    return expression.replace('^', '**')
+
+
+@lru_cache(maxsize=1024)
+def _parse(expression: str) -> ast.AST:
+    """Parse an expression once and cache the tree"""
+    try:
+        return ast.parse(expression, mode='eval').body
+    except SyntaxError:
+        raise CalcError("Invalid math expression!")
+
+
+def _check_size(value):
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise CalcError("Numbers are too large!")
+    return value
+
+
+def _power(base, exponent):
+    """Raise to a power only when the result stays within the size limits"""
+    if abs(exponent) > MAX_EXPONENT:
+        raise CalcError(f"Exponent is too large! (max {MAX_EXPONENT})")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        if base.bit_length() * exponent > MAX_INT_BITS:
+            raise CalcError("Numbers are too large!")
+    return base ** exponent
+
+
+def _eval_node(node):
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return _check_size(node.value)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        return UNARY_OPERATORS[type(node.op)](_eval_node(node.operand))
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        left = _eval_node(node.left)
+        right = _eval_node(node.right)
+        if isinstance(node.op, ast.Pow):
+            return _check_size(_power(left, right))
+        if isinstance(node.op, ast.Mult) and isinstance(left, int) and isinstance(right, int):
+            if left.bit_length() + right.bit_length() > MAX_INT_BITS:
+                raise CalcError("Numbers are too large!")
+        return _check_size(BINARY_OPERATORS[type(node.op)](left, right))
+    raise CalcError("Invalid math expression!")
+
+
+@lru_cache(maxsize=1024)
+def evaluate(expression: str) -> str:
+    """Evaluate a normalized arithmetic expression and format the result"""
+    try:
+        result = str(_eval_node(_parse(expression)))
+    except ZeroDivisionError:
+        raise CalcError("Division by zero!")
+    except (OverflowError, ValueError):
+        raise CalcError("Numbers are too large!")
+    except RecursionError:
+        raise CalcError("Expression is too deeply nested!")
+    if len(result) > MAX_RESULT_LENGTH:
+        raise CalcError("Result is too long to display!")
+    return result
+
+
+class Calculator:
+    """Evaluates expressions in a process pool with a time budget and a result cache"""
+
+    def __init__(self, processes: int = 1, timeout: float = 2.0, cache_size: int = 1024):
+        self.processes = processes
+        self.timeout = timeout
+        self.cache_size = cache_size
+        # Results and CalcErrors keyed by normalized expression
+        self._cache = OrderedDict()
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                context = multiprocessing.get_context('spawn')
+                self._pool = context.Pool(self.processes)
+            return self._pool
+
+    def _reset_pool(self, pool):
+        """Kill a pool whose worker is stuck so the next call gets a fresh one"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        threading.Thread(target=pool.terminate, daemon=True).start()
+
+    def _remember(self, key: str, value):
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def calculate(self, expression: str) -> str:
+        """Evaluate an expression off the event loop; raises CalcError"""
+        key = normalize(expression.strip())
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            cached = self._cache[key]
+            if isinstance(cached, CalcError):
+                raise cached
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(result=None, error=None):
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        pool = self._get_pool()
+        pool.apply_async(
+            evaluate, (key,),
+            callback=lambda result: loop.call_soon_threadsafe(resolve, result),
+            error_callback=lambda error: loop.call_soon_threadsafe(resolve, None, error)
+        )
+
+        try:
+            result = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self._reset_pool(pool)
+            raise CalcError("Expression took too long to evaluate!")
+        except CalcError as e:
+            self._remember(key, e)
+            raise
+        except Exception:
+            raise CalcError("Invalid math expression!")
+
+        self._remember(key, result)
+        return result
+
+    def close(self):
+        """Shut down the worker pool"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
@@ -0,0 +1,144 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Events whose `content` is user text
+CONTENT_EVENTS = ('MESSAGE_CREATE', 'MESSAGE_UPDATE')
+
+
+# Arguments that keep their text in a shape-preserving capture: mentions, numbers and arithmetic
+_SAFE_ARGUMENT = re.compile(r'<(@[!&]?|#)\d+>|[\d.+\-*/%^()]+')
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:12]
+
+
+def hash_text(text: str, prefix: str, keep_shape: bool = False) -> str:
+    """Replace message text with a digest, keeping the command name so dispatch behaves the same.
+
+    By default all arguments become one digest, so replayed commands run into their
+    argument errors (a !give with no member, a !calc that doesn't parse). With
+    keep_shape, each argument is digested on its own and mentions, numbers and
+    arithmetic are kept, so replayed commands take the same paths as the originals.
+    """
+    if not text:
+        return text
+    if text.startswith(prefix):
+        name, _, rest = text[len(prefix):].partition(' ')
+        if not rest:
+            return text[:len(prefix) + len(name)]
+        if keep_shape:
+            arguments = [word if not word or _SAFE_ARGUMENT.fullmatch(word) else f'h{_digest(word)}' for word in rest.split(' ')]
+            return f'{prefix}{name} {" ".join(arguments)}'
+        return f'{prefix}{name} #{_digest(rest)}'
+    return f'#{_digest(text)}'
+
+
+class GatewayCapture:
+    """Append-only, size-rotated JSONL log of the dispatch events bots receive"""
+
+    def __init__(self, path: str, hash_content: bool = True, events: Optional[Iterable[str]] = None,
+                 prefix: str = '!', keep_shape: bool = False, max_bytes: int = 64 * 1024 * 1024, backups: int = 5,
+                 max_queue: int = 100000):
+        self.path = path
+        self.hash_content = hash_content
+        self.events = frozenset(events) if events else None
+        self.prefix = prefix
+        self.keep_shape = keep_shape
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.max_queue = max_queue
+        self.recorded = 0
+        self.dropped = 0
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._write, name='gateway-capture', daemon=True)
+        self._thread.start()
+
+    def record(self, bot_id: str, shard_id: int, raw: str):
+        """Queue one raw gateway message (called on the loop thread, before discord.py parses it)"""
+        if self._queue.qsize() >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.put((time.time(), bot_id, shard_id, raw))
+
+    def close(self):
+        """Write out what is queued and close the file"""
+        self._queue.put(None)
+        self._thread.join(10)
+
+    def _entry(self, received: float, bot_id: str, shard_id: int, raw: str) -> Optional[str]:
+        """Turn a raw gateway message into a capture line, or None if it isn't captured"""
+        message = json.loads(raw)
+        event = message.get('t')
+        if message.get('op') != 0 or (self.events is not None and event not in self.events):
+            return None
+        data = message.get('d')
+        if self.hash_content and event in CONTENT_EVENTS and isinstance(data, dict) and 'content' in data:
+            data['content'] = hash_text(data['content'], self.prefix, self.keep_shape)
+        return json.dumps({'t': round(received, 4), 'b': bot_id, 's': shard_id, 'e': event, 'd': data},
+                          separators=(',', ':'))
+
+    def _write(self):
+        """Parse, filter and append queued messages on the capture thread"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                line = self._entry(*item)
+            except ValueError as e:
+                logging.error(f"Could not capture gateway message: {e}")
+                continue
+            if line is None:
+                continue
+            self._file.write(line + '\n')
+            self.recorded += 1
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+            elif self._queue.empty():
+                self._file.flush()
+        self._file.close()
+
+    def _rotate(self):
+        """Shift capture.jsonl -> capture.jsonl.1 -> ... and start a new file"""
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f'{self.path}.{index}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.path}.{index + 1}')
+        if self.backups > 0:
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def get_status(self) -> Dict[str, Any]:
+        return {'path': self.path, 'recorded': self.recorded, 'dropped': self.dropped, 'queued': self._queue.qsize()}
+
+
+def capture_files(path: str) -> List[str]:
+    """Get a capture and its rotated parts, oldest first"""
+    rotated = [name for name in glob.glob(f'{glob.escape(path)}.*') if name.rsplit('.', 1)[1].isdigit()]
+    rotated.sort(key=lambda name: int(name.rsplit('.', 1)[1]), reverse=True)
+    return rotated + ([path] if os.path.exists(path) else [])
+
+
+def read_capture(paths: Iterable[str], bot_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield captured events in file order, optionally only those of one bot"""
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if bot_id is None or entry['b'] == bot_id:
+                    yield entry
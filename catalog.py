@@ -0,0 +1,99 @@
+import json
+import os
+import sys
+import importlib
+from collections import namedtuple, OrderedDict
+from typing import Any, Dict, List, Tuple
+from discord.ext import commands
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog.json')
+HANDLER_PACKAGE = 'bot_commands'
+
+Category = namedtuple('Category', 'key label title module rate_limit')
+CommandEntry = namedtuple('CommandEntry', 'name category usage help handler hidden')
+
+
+class Catalog:
+    """Declarative command table loaded once and shared by every bot in the process"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.categories = OrderedDict(
+            (key, Category(key, value['label'], value['title'], value['module'], value.get('rate_limit', {})))
+            for key, value in data['categories'].items()
+        )
+        self.entries = [
+            CommandEntry(
+                entry['name'],
+                entry['category'],
+                entry.get('usage', f"!{entry['name']}"),
+                entry.get('help', ''),
+                entry.get('handler'),
+                entry.get('hidden', False)
+            )
+            for entry in data['commands']
+        ]
+        self.content = data['content']
+        self.commands = self._build_commands()
+        self.command_names = frozenset(command.name for command in self.commands)
+        self.command_categories = {entry.name: entry.category for entry in self.entries if entry.handler}
+
+    def _build_commands(self) -> List[commands.Command]:
+        """Create one Command object per catalog entry that has a handler"""
+        built = []
+        for entry in self.entries:
+            # Entries without a handler only appear in `!help`
+            if entry.handler is None:
+                continue
+            module = importlib.import_module(f'{HANDLER_PACKAGE}.{self.categories[entry.category].module}')
+            built.append(commands.Command(getattr(module, entry.handler), name=entry.name))
+        return built
+
+    def help_entries(self, category: str) -> List[CommandEntry]:
+        """Get the entries listed by `!help <category>`"""
+        return [entry for entry in self.entries if entry.category == category and not entry.hidden]
+
+    def rate_limits(self) -> Dict[str, Dict[str, Tuple[int, float]]]:
+        """Get the per-category (rate, per) limits for users and guilds"""
+        return {
+            key: {scope: tuple(limit) for scope, limit in category.rate_limit.items()}
+            for key, category in self.categories.items()
+        }
+
+    def attach(self, bot: commands.Bot):
+        """Register the shared commands on a bot"""
+        for command in self.commands:
+            bot.add_command(command)
+
+
+_catalog = None
+
+
+def load_catalog(path: str = CATALOG_PATH) -> Catalog:
+    """Read a catalog file"""
+    with open(path, encoding='utf-8') as f:
+        return Catalog(json.load(f))
+
+
+def get_catalog() -> Catalog:
+    """Load the command catalog once per process"""
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog()
+    return _catalog
+
+
+def reload_catalog(path: str = CATALOG_PATH) -> Catalog:
+    """Re-read the catalog and re-import every handler module; the old catalog stays on failure"""
+    global _catalog
+    prefix = f'{HANDLER_PACKAGE}.'
+    previous = {name: module for name, module in sys.modules.items() if name.startswith(prefix)}
+    for name in previous:
+        del sys.modules[name]
+    importlib.invalidate_caches()
+    try:
+        catalog = load_catalog(path)
+    except Exception:
+        sys.modules.update(previous)
+        raise
+    _catalog = catalog
+    return catalog
@@ -0,0 +1,115 @@
+import random
+import discord
+from typing import Dict, Tuple
+from catalog import Catalog, get_catalog
+
+PREMIUM_FOOTER = "🎉 Función premium disponible GRATIS durante mantenimiento!"
+
+
+class FrozenEmbed(discord.Embed):
+    """Embed built from a payload once; every send reuses the same serialized dict"""
+    
+    @classmethod
+    def from_payload(cls, payload: Dict) -> 'FrozenEmbed':
+        embed = cls.from_dict(payload)
+        embed._payload = payload
+        return embed
+    
+    def to_dict(self) -> Dict:
+        # These embeds are never mutated after build, so the payload stays valid
+        return self._payload
+
+
+def _payload(title: str, description: str = None, color: int = 0x0099ff, fields: Tuple = (), footer: str = None) -> Dict:
+    """Build an embed payload in the shape the HTTP layer sends"""
+    payload = {'type': 'rich', 'title': title, 'color': color}
+    if description is not None:
+        payload['description'] = description
+    if fields:
+        payload['fields'] = [{'name': name, 'value': value, 'inline': inline} for name, value, inline in fields]
+    if footer is not None:
+        payload['footer'] = {'text': footer}
+    return payload
+
+
+class ContentRegistry:
+    """Pre-serialized embeds and static tables for the commands, built from the catalog"""
+    
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+        tables = catalog.content
+        self.help_index = FrozenEmbed.from_payload(_payload(
+            "📖 Bot Commands Categories",
+            "Use `!help <category>` for specific commands",
+            fields=tuple((category.label, f"`!help {key}`", True) for key, category in catalog.categories.items()),
+            footer="🎉 Acceso GRATIS a funciones premium durante mantenimiento - ¡Disfrútalo!"
+        ))
+        self.help_categories = {
+            key: FrozenEmbed.from_payload(_payload(
+                category.title,
+                fields=tuple((entry.usage, entry.help, False) for entry in catalog.help_entries(key))
+            ))
+            for key, category in catalog.categories.items()
+        }
+        self.unknown_category = FrozenEmbed.from_payload(_payload(
+            "❌ Unknown Category",
+            "Use `!help` to see all categories"
+        ))
+        self.jokes = tuple(FrozenEmbed.from_payload(_payload("😂 Random Joke", joke, 0xffff00)) for joke in tables['jokes'])
+        self.facts = tuple(FrozenEmbed.from_payload(_payload("🧠 Fun Fact", fact, 0x00ffff)) for fact in tables['facts'])
+        self.quotes = tuple(FrozenEmbed.from_payload(_payload("💭 Inspirational Quote", quote, 0xff69b4)) for quote in tables['quotes'])
+        self.trivia = tuple(
+            FrozenEmbed.from_payload(_payload("🧩 Trivia Question", f"**{question}**", 0x4169e1, footer=f"Answer: {answer}"))
+            for question, answer in tables['trivia']
+        )
+        self.music_paused = FrozenEmbed.from_payload(_payload(
+            "⏸️ Music Paused", "Music playback has been paused.", 0xffa500, footer=PREMIUM_FOOTER
+        ))
+        self.music_stopped = FrozenEmbed.from_payload(_payload(
+            "⏹️ Music Stopped", "Music playback has been stopped.", 0xff0000, footer=PREMIUM_FOOTER
+        ))
+        self.music_queue = FrozenEmbed.from_payload(_payload(
+            "🎵 Music Queue",
+            "**Now Playing:** Demo Song - 3:45\n\n**Up Next:**\n1. Another Demo Song - 4:12\n2. Third Demo Song - 2:58",
+            0x1db954,
+            footer="🎉 Sistema de música premium disponible GRATIS!"
+        ))
+        
+        # Tables for commands whose replies depend on the invocation
+        self.eight_ball_responses = tuple(tables['eight_ball'])
+        self.roasts = tuple(tables['roasts'])
+        self.compliments = tuple(tables['compliments'])
+        self.hangman_words = tuple(tables['hangman_words'])
+        self.scrambled_words = tuple(tuple(pair) for pair in tables['scrambled_words'])
+        self.first_names = tuple(tables['first_names'])
+        self.last_names = tuple(tables['last_names'])
+    
+    def help(self, category: str = None) -> FrozenEmbed:
+        """Get the help index, or the embed for one category"""
+        if category is None:
+            return self.help_index
+        return self.help_categories.get(category.lower(), self.unknown_category)
+    
+    def random_joke(self) -> FrozenEmbed:
+        return random.choice(self.jokes)
+    
+    def random_fact(self) -> FrozenEmbed:
+        return random.choice(self.facts)
+    
+    def random_quote(self) -> FrozenEmbed:
+        return random.choice(self.quotes)
+    
+    def random_trivia(self) -> FrozenEmbed:
+        return random.choice(self.trivia)
+
+
+_registry = None
+
+
+def get_registry() -> ContentRegistry:
+    """Build the content registry once per catalog"""
+    global _registry
+    catalog = get_catalog()
+    if _registry is None or _registry.catalog is not catalog:
+        _registry = ContentRegistry(catalog)
+    return _registry
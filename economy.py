@@ -0,0 +1,200 @@
+import asyncio
+import sqlite3
+import threading
+import logging
+import atexit
+import datetime
+from collections import OrderedDict
+from typing import Tuple, Dict, List, Optional
+
+# (bot_id, user_id) identifies an account; balances are kept per bot
+AccountKey = Tuple[str, int]
+
+
+class EconomyStore:
+    """Persistent backend for economy accounts"""
+
+    def load(self, key: AccountKey) -> Optional[Tuple[int, Optional[str]]]:
+        """Load (balance, last_daily ISO date) for an account, or None if unknown"""
+        raise NotImplementedError
+
+    def save_many(self, rows: List[Tuple[str, int, int, Optional[str]]]):
+        """Persist (bot_id, user_id, balance, last_daily) rows in one transaction"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release backend resources"""
+
+
+class SQLiteEconomyStore(EconomyStore):
+    """Economy backend on a local SQLite database in WAL mode"""
+
+    def __init__(self, path: str = 'economy.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS accounts ('
+            ' bot_id TEXT NOT NULL,'
+            ' user_id INTEGER NOT NULL,'
+            ' balance INTEGER NOT NULL DEFAULT 0,'
+            ' last_daily TEXT,'
+            ' PRIMARY KEY (bot_id, user_id))'
+        )
+
+    def load(self, key: AccountKey) -> Optional[Tuple[int, Optional[str]]]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT balance, last_daily FROM accounts WHERE bot_id = ? AND user_id = ?', key
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def save_many(self, rows: List[Tuple[str, int, int, Optional[str]]]):
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany(
+                    'INSERT INTO accounts (bot_id, user_id, balance, last_daily) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (bot_id, user_id) DO UPDATE SET '
+                    'balance = excluded.balance, last_daily = excluded.last_daily',
+                    rows
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class Economy:
+    """Write-back cache in front of an EconomyStore with batched flushes"""
+
+    def __init__(self, store: EconomyStore, flush_interval: float = 5.0, max_cached: int = 10000):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_cached = max_cached
+        # key -> [balance, last_daily]; least recently used first
+        self._accounts: Dict[AccountKey, list] = OrderedDict()
+        self._dirty = set()
+        # Keys taken out of _dirty by a flush that hasn't committed yet; still not evictable
+        self._flushing = set()
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name='economy-flush', daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _account(self, key: AccountKey) -> list:
+        """Get a cached account, loading it from the store on a miss"""
+        account = self._accounts.get(key)
+        if account is not None:
+            self._accounts.move_to_end(key)
+            return account
+
+        # Commands prefetch off the event loop, so this only reads the store when an
+        # account was evicted in between or the caller isn't on a loop
+        row = self.store.load(key)
+        account = [row[0], row[1]] if row else [0, None]
+        self._accounts[key] = account
+        self._evict()
+        return account
+
+    def _evict(self):
+        """Drop least recently used clean accounts beyond the cache size"""
+        excess = len(self._accounts) - self.max_cached
+        if excess <= 0:
+            return
+        for key in list(self._accounts):
+            if excess <= 0:
+                break
+            if key not in self._dirty and key not in self._flushing:
+                del self._accounts[key]
+                excess -= 1
+
+    async def prefetch(self, bot_id: str, *user_ids: int):
+        """Cache the given accounts, reading misses on a worker thread so the event loop never waits on the store"""
+        with self._lock:
+            missing = [(bot_id, user_id) for user_id in user_ids if (bot_id, user_id) not in self._accounts]
+        if missing:
+            await asyncio.to_thread(self._load_many, missing)
+
+    def _load_many(self, keys: List[AccountKey]):
+        for key in keys:
+            row = self.store.load(key)
+            with self._lock:
+                # Another caller may have loaded or written it meanwhile
+                if key not in self._accounts:
+                    self._accounts[key] = [row[0], row[1]] if row else [0, None]
+                    self._evict()
+
+    def balance(self, bot_id: str, user_id: int) -> int:
+        """Get a user's coin balance"""
+        with self._lock:
+            return self._account((bot_id, user_id))[0]
+
+    def claim_daily(self, bot_id: str, user_id: int, today: datetime.date, reward: int) -> Tuple[bool, int]:
+        """Credit the daily reward once per day; returns (claimed, new balance)"""
+        key = (bot_id, user_id)
+        with self._lock:
+            account = self._account(key)
+            if account[1] == today.isoformat():
+                return False, account[0]
+            account[0] += reward
+            account[1] = today.isoformat()
+            self._dirty.add(key)
+            return True, account[0]
+
+    def transfer(self, bot_id: str, sender_id: int, receiver_id: int, amount: int) -> bool:
+        """Atomically move coins between users; False if the sender can't afford it"""
+        sender_key = (bot_id, sender_id)
+        receiver_key = (bot_id, receiver_id)
+        with self._lock:
+            sender = self._account(sender_key)
+            receiver = self._account(receiver_key)
+            if amount <= 0 or sender[0] < amount:
+                return False
+            sender[0] -= amount
+            receiver[0] += amount
+            # Both rows land in the same flush batch, so the transfer is
+            # persisted in a single transaction
+            self._dirty.add(sender_key)
+            self._dirty.add(receiver_key)
+            return True
+
+    def flush(self):
+        """Write all dirty accounts to the store in one batch"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                rows = [(key[0], key[1], *self._accounts[key]) for key in self._dirty]
+                dirty, self._dirty = self._dirty, set()
+                self._flushing = dirty
+
+            try:
+                self.store.save_many(rows)
+            except Exception as e:
+                logging.error(f"Error flushing economy data: {e}")
+                with self._lock:
+                    self._dirty |= dirty
+            finally:
+                with self._lock:
+                    self._flushing = set()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """Flush pending writes and close the store"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self.flush()
+        self.store.close()
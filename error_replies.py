@@ -0,0 +1,75 @@
+import difflib
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+from content import FrozenEmbed, _payload
+
+NOT_FOUND_MODES = ('suggest', 'reply', 'silent')
+
+
+class NotFoundPolicy:
+    """Decides whether (and with which cached embed) to answer an unknown command"""
+
+    def __init__(self, names: Iterable[str], mode: str = 'suggest', window: float = 30.0, max_channels: int = 10000):
+        if mode not in NOT_FOUND_MODES:
+            raise ValueError(f"Unknown CommandNotFound reply mode: {mode}")
+        self.mode = mode
+        self.window = window
+        self.max_channels = max_channels
+        # channel ID -> monotonic time of the last reply; oldest first
+        self._last_reply: Dict[int, float] = OrderedDict()
+        self.generic = FrozenEmbed.from_payload(_payload(
+            "❌ Command Not Found",
+            "That command was not found.\nUse `!help` to see available commands.",
+            0xff0000
+        ))
+        self.set_names(names)
+
+    def set_names(self, names: Iterable[str]):
+        """Rebuild the suggestion index for a new set of command names"""
+        self.names = tuple(sorted(names))
+        self._lowercase = {name.lower(): name for name in self.names}
+        # One embed per command that can be suggested, built on first use
+        self._suggestions: Dict[str, FrozenEmbed] = {}
+        self.closest = lru_cache(maxsize=4096)(self._closest)
+
+    def _closest(self, invoked: str) -> Optional[str]:
+        """Find the command name an unknown name was most likely meant to be"""
+        lowered = invoked.lower()
+        if lowered in self._lowercase:
+            return self._lowercase[lowered]
+        matches = difflib.get_close_matches(lowered, self.names, n=1, cutoff=0.7)
+        return matches[0] if matches else None
+
+    def _suggestion(self, name: str) -> FrozenEmbed:
+        embed = self._suggestions.get(name)
+        if embed is None:
+            embed = self._suggestions[name] = FrozenEmbed.from_payload(_payload(
+                "❌ Command Not Found",
+                f"That command was not found. Did you mean `!{name}`?\nUse `!help` to see available commands.",
+                0xff0000
+            ))
+        return embed
+
+    def reply_for(self, channel_id: int, invoked: str) -> Optional[FrozenEmbed]:
+        """Get the embed to send for an unknown command, or None to stay quiet"""
+        # Things like `!!!` or `!?` are punctuation, not attempts at a command
+        if self.mode == 'silent' or not invoked[:1].isalnum():
+            return None
+
+        now = time.monotonic()
+        last = self._last_reply.get(channel_id)
+        if last is not None and now - last < self.window:
+            return None
+        self._last_reply[channel_id] = now
+        self._last_reply.move_to_end(channel_id)
+        while len(self._last_reply) > self.max_channels:
+            self._last_reply.popitem(last=False)
+
+        if self.mode == 'suggest':
+            name = self.closest(invoked)
+            if name is not None:
+                return self._suggestion(name)
+        return self.generic
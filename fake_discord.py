@@ -0,0 +1,324 @@
+"""Local stand-in for the Discord gateway and REST API, for load testing bots offline.
+
+It speaks enough of both for discord.py to log in, IDENTIFY (or RESUME), receive
+READY and one GUILD_CREATE per synthetic guild, and reply to MESSAGE_CREATE
+events through `/channels/{id}/messages`, reactions and bulk delete.
+"""
+import base64
+import itertools
+import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+import yarl
+
+TIMESTAMP = '2024-01-01T00:00:00+00:00'
+HEARTBEAT_INTERVAL_MS = 41250
+
+# Synthetic snowflakes: guild i of bot b is GUILD_BASE + b * GUILDS_PER_BOT_SPAN + i
+GUILD_BASE = 700000000000000000
+GUILDS_PER_BOT_SPAN = 10 ** 9
+CHANNEL_OFFSET = 10 ** 12
+USER_BASE = 600000000000000000
+
+# Called for every message a bot posts: (channel ID, number of replies it carries, monotonic time)
+ReplyCallback = Callable[[int, int, float], None]
+# Called instead of the synthetic READY/GUILD_CREATE burst when a bot IDENTIFYs
+IdentifyCallback = Callable[['FakeBot'], Awaitable[None]]
+
+
+def make_token(application_id: int) -> str:
+    """Build a token whose first segment decodes to the application ID, like a real bot token"""
+    first = base64.b64encode(str(application_id).encode()).decode().rstrip('=')
+    return f'{first}.{"x" * 6}.{"y" * 38}'
+
+
+def application_id(token: str) -> int:
+    first = token.split('.')[0]
+    return int(base64.b64decode(first + '=' * (-len(first) % 4)))
+
+
+def user_payload(user_id: int, name: str, bot: bool = False) -> Dict[str, Any]:
+    return {'id': str(user_id), 'username': name, 'discriminator': '0', 'global_name': None, 'avatar': None, 'bot': bot}
+
+
+def member_payload(user: Dict[str, Any]) -> Dict[str, Any]:
+    return {'user': user, 'roles': [], 'joined_at': TIMESTAMP, 'deaf': False, 'mute': False, 'flags': 0}
+
+
+def _json(data: Any, status: int = 200) -> web.Response:
+    # discord.py only decodes bodies whose content type is exactly application/json
+    return web.Response(body=json.dumps(data).encode(), status=status, headers={'Content-Type': 'application/json'})
+
+
+def point_discord_py_at(base_url: str):
+    """Make discord.py in this process use the fake server for REST and the gateway"""
+    from discord.gateway import DiscordWebSocket
+    from discord.http import Route
+
+    Route.BASE = f'{base_url}/api/v10'
+    DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f'{base_url.replace("http", "ws", 1)}/gateway')
+
+
+class FakeBot:
+    """What the fake Discord knows about one connected bot"""
+
+    def __init__(self, index: int, token: str, guild_count: int):
+        self.index = index
+        self.token = token
+        self.id = application_id(token)
+        self.user = user_payload(self.id, f'loadtest-bot-{index}', bot=True)
+        first = GUILD_BASE + index * GUILDS_PER_BOT_SPAN
+        self.guild_ids = list(range(first, first + guild_count))
+        self.ws: Optional[web.WebSocketResponse] = None
+        self.session_id = None
+        self.sequence = 0
+
+    def guild_payload(self, guild_id: int) -> Dict[str, Any]:
+        channel_id = guild_id + CHANNEL_OFFSET
+        return {
+            'id': str(guild_id),
+            'name': f'Load Test Guild {guild_id - GUILD_BASE}',
+            'owner_id': str(USER_BASE),
+            'unavailable': False,
+            'large': False,
+            # Equal to the members sent, so discord.py considers the guild chunked
+            'member_count': 1,
+            'joined_at': TIMESTAMP,
+            'roles': [{
+                'id': str(guild_id), 'name': '@everyone', 'permissions': '104324673', 'position': 0,
+                'color': 0, 'hoist': False, 'managed': False, 'mentionable': False
+            }],
+            'channels': [{
+                'id': str(channel_id), 'type': 0, 'name': 'general', 'position': 0, 'permission_overwrites': []
+            }],
+            'members': [member_payload(self.user)],
+            'presences': [],
+            'voice_states': [],
+            'threads': [],
+            'stage_instances': [],
+            'guild_scheduled_events': [],
+            'emojis': [],
+            'stickers': [],
+            'features': []
+        }
+
+
+class FakeDiscord:
+    """aiohttp server implementing the gateway and REST routes discord.py needs"""
+
+    def __init__(self, bots: int = 1, guilds_per_bot: int = 100, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self.bots: Dict[str, FakeBot] = {}
+        for index in range(bots):
+            self.add_bot(make_token(800000000000000000 + index), guilds_per_bot)
+        self.on_reply: Optional[ReplyCallback] = None
+        self.on_identify: Optional[IdentifyCallback] = None
+        self.requests = 0
+        self._message_ids = itertools.count(900000000000000000)
+        self._runner = None
+        self.base_url = None
+
+    def add_bot(self, token: str, guild_count: int = 0) -> FakeBot:
+        """Accept another bot token"""
+        bot = FakeBot(len(self.bots), token, guild_count)
+        self.bots[token] = bot
+        return bot
+
+    @property
+    def tokens(self) -> List[str]:
+        return list(self.bots)
+
+    async def start(self) -> str:
+        """Start listening; returns the base URL"""
+        app = web.Application()
+        app.router.add_get('/gateway', self._gateway)
+        api = '/api/v10'
+        app.router.add_get(f'{api}/users/@me', self._me)
+        app.router.add_get(f'{api}/oauth2/applications/@me', self._application)
+        app.router.add_get(f'{api}/gateway', self._gateway_url)
+        app.router.add_get(f'{api}/gateway/bot', self._gateway_url)
+        app.router.add_post(f'{api}/channels/{{channel_id}}/messages', self._create_message)
+        app.router.add_get(f'{api}/channels/{{channel_id}}/messages', self._history)
+        app.router.add_post(f'{api}/channels/{{channel_id}}/messages/bulk-delete', self._no_content)
+        app.router.add_delete(f'{api}/channels/{{channel_id}}/messages/{{message_id}}', self._no_content)
+        app.router.add_put(f'{api}/channels/{{channel_id}}/messages/{{message_id}}/reactions/{{emoji}}/@me', self._no_content)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f'http://{self.host}:{port}'
+        return self.base_url
+
+    @property
+    def gateway_url(self) -> str:
+        return f'{self.base_url.replace("http", "ws", 1)}/gateway'
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def _bot(self, request: web.Request) -> FakeBot:
+        token = request.headers.get('Authorization', '').replace('Bot ', '', 1)
+        bot = self.bots.get(token)
+        if bot is None:
+            raise web.HTTPUnauthorized(body=json.dumps({'message': '401: Unauthorized', 'code': 0}).encode(),
+                                       headers={'Content-Type': 'application/json'})
+        return bot
+
+    # REST
+
+    async def _me(self, request: web.Request) -> web.Response:
+        return _json(self._bot(request).user)
+
+    async def _application(self, request: web.Request) -> web.Response:
+        bot = self._bot(request)
+        return _json({
+            'id': str(bot.id),
+            'name': bot.user['username'],
+            'icon': None,
+            'description': '',
+            'bot_public': True,
+            'bot_require_code_grant': False,
+            'owner': user_payload(USER_BASE, 'owner'),
+            'verify_key': '0' * 64,
+            'flags': 0,
+            'team': None
+        })
+
+    async def _gateway_url(self, request: web.Request) -> web.Response:
+        return _json({
+            'url': self.gateway_url,
+            'shards': 1,
+            'session_start_limit': {'total': 1000, 'remaining': 1000, 'reset_after': 0, 'max_concurrency': 16}
+        })
+
+    async def _create_message(self, request: web.Request) -> web.Response:
+        bot = self._bot(request)
+        self.requests += 1
+        if request.content_type == 'multipart/form-data':
+            form = await request.post()
+            payload = json.loads(form.get('payload_json', '{}'))
+        else:
+            payload = await request.json()
+        channel_id = int(request.match_info['channel_id'])
+        embeds = payload.get('embeds') or []
+        if self.on_reply is not None:
+            # The outbound queue merges queued replies into one message, one embed each
+            self.on_reply(channel_id, len(embeds) or 1, time.monotonic())
+        return _json({
+            'id': str(next(self._message_ids)),
+            'channel_id': str(channel_id),
+            'guild_id': str(channel_id - CHANNEL_OFFSET),
+            'author': bot.user,
+            'content': payload.get('content') or '',
+            'timestamp': TIMESTAMP,
+            'edited_timestamp': None,
+            'tts': False,
+            'mention_everyone': False,
+            'mentions': [],
+            'mention_roles': [],
+            'attachments': [],
+            'embeds': embeds,
+            'pinned': False,
+            'type': 0,
+            'flags': 0
+        })
+
+    async def _history(self, request: web.Request) -> web.Response:
+        self._bot(request)
+        return _json([])
+
+    async def _no_content(self, request: web.Request) -> web.Response:
+        self._bot(request)
+        self.requests += 1
+        return web.Response(status=204)
+
+    # Gateway
+
+    async def _gateway(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({'op': 10, 'd': {'heartbeat_interval': HEARTBEAT_INTERVAL_MS}}))
+        bot = None
+        async for message in ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                continue
+            payload = json.loads(message.data)
+            op = payload['op']
+            if op == 1:
+                await ws.send_str(json.dumps({'op': 11}))
+            elif op == 2:
+                bot = self.bots.get(payload['d']['token'])
+                if bot is None:
+                    await ws.close(code=4004, message=b'Authentication failed.')
+                    break
+                await self._identify(bot, ws)
+            elif op == 6:
+                bot = self.bots.get(payload['d']['token'])
+                if bot is None or payload['d']['session_id'] != bot.session_id:
+                    # Not resumable: discord.py will IDENTIFY again
+                    await ws.send_str(json.dumps({'op': 9, 'd': False}))
+                    continue
+                bot.ws = ws
+                await self.dispatch(bot, 'RESUMED', {})
+        if bot is not None and bot.ws is ws:
+            bot.ws = None
+        return ws
+
+    async def _identify(self, bot: FakeBot, ws: web.WebSocketResponse):
+        bot.ws = ws
+        bot.sequence = 0
+        bot.session_id = uuid.uuid4().hex
+        if self.on_identify is not None:
+            await self.on_identify(bot)
+            return
+        await self.dispatch(bot, 'READY', {
+            'v': 10,
+            'user': bot.user,
+            'guilds': [{'id': str(guild_id), 'unavailable': True} for guild_id in bot.guild_ids],
+            'session_id': bot.session_id,
+            'resume_gateway_url': self.gateway_url,
+            'application': {'id': str(bot.id), 'flags': 0},
+            'private_channels': [],
+            'relationships': []
+        })
+        for guild_id in bot.guild_ids:
+            await self.dispatch(bot, 'GUILD_CREATE', bot.guild_payload(guild_id))
+        logging.info(f"Fake gateway sent READY and {len(bot.guild_ids)} guilds to bot {bot.index}")
+
+    async def dispatch(self, bot: FakeBot, event: str, data: Dict[str, Any]):
+        """Send a DISPATCH event on a bot's gateway connection"""
+        bot.sequence += 1
+        await bot.ws.send_str(json.dumps({'op': 0, 's': bot.sequence, 't': event, 'd': data}))
+
+    async def message_create(self, bot: FakeBot, guild_id: int, author_id: int, content: str):
+        """Deliver a user message to a bot, as if someone typed it in the guild's channel"""
+        author = user_payload(author_id, f'user{author_id - USER_BASE}')
+        member = member_payload(author)
+        del member['user']
+        await self.dispatch(bot, 'MESSAGE_CREATE', {
+            'id': str(next(self._message_ids)),
+            'channel_id': str(guild_id + CHANNEL_OFFSET),
+            'guild_id': str(guild_id),
+            'author': author,
+            'member': member,
+            'content': content,
+            'timestamp': TIMESTAMP,
+            'edited_timestamp': None,
+            'tts': False,
+            'mention_everyone': False,
+            'mentions': [],
+            'mention_roles': [],
+            'attachments': [],
+            'embeds': [],
+            'pinned': False,
+            'type': 0,
+            'flags': 0
+        })
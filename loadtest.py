@@ -0,0 +1,209 @@
+"""End-to-end load test: BotManager bots against a local fake Discord (see fake_discord.py).
+
+    python loadtest.py --guilds 2000 --rate 200 --duration 10
+    python loadtest.py --guilds 2000 --ramp 100,200,400,800,1600 --slo 0.5
+
+The fake gateway/REST server and the message driver run in a child process, so
+the numbers describe what one bot process (this one) can sustain. Latency is
+measured from MESSAGE_CREATE being sent to the reply arriving at the fake REST API.
+"""
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+DEFAULT_COMMANDS = ['!ping', '!coinflip', '!8ball will it scale?', '!joke', '!userinfo']
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class LoadDriver:
+    """Fires MESSAGE_CREATE events at a fixed rate and matches the replies to them"""
+
+    def __init__(self, fake, commands: List[str], users: int):
+        self.fake = fake
+        self.commands = commands
+        self.users = users
+        # channel ID -> send times of commands still waiting for a reply, oldest first
+        self.pending: Dict[int, deque] = {}
+        self.latencies: List[float] = []
+        self.last_reply = 0.0
+        targets = [(bot, guild_id) for bot in fake.bots.values() for guild_id in bot.guild_ids]
+        random.shuffle(targets)
+        self.targets = itertools.cycle(targets)
+        fake.on_reply = self._on_reply
+
+    def _on_reply(self, channel_id: int, count: int, now: float):
+        waiting = self.pending.get(channel_id)
+        while waiting and count:
+            self.latencies.append(now - waiting.popleft())
+            count -= 1
+        self.last_reply = now
+
+    async def run_step(self, rate: float, duration: float, drain: float) -> Dict[str, Any]:
+        """Offer `rate` commands/sec for `duration` seconds, then wait up to `drain` seconds for replies"""
+        from fake_discord import CHANNEL_OFFSET, USER_BASE
+
+        self.pending = {}
+        self.latencies = []
+        sent = 0
+        started = time.monotonic()
+        elapsed = 0.0
+        while elapsed < duration:
+            # Open loop: a slow bot doesn't slow down the arrivals
+            due = int(rate * elapsed) - sent
+            for _ in range(due):
+                bot, guild_id = next(self.targets)
+                self.pending.setdefault(guild_id + CHANNEL_OFFSET, deque()).append(time.monotonic())
+                await self.fake.message_create(
+                    bot, guild_id, USER_BASE + 1 + random.randrange(self.users), random.choice(self.commands)
+                )
+            sent += max(due, 0)
+            await asyncio.sleep(0.005)
+            elapsed = time.monotonic() - started
+
+        deadline = time.monotonic() + drain
+        while len(self.latencies) < sent and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        answered = len(self.latencies)
+        window = max((self.last_reply if answered else time.monotonic()) - started, duration)
+        return {
+            'rate': rate,
+            'sent': sent,
+            'answered': answered,
+            'unanswered': sent - answered,
+            'throughput': answered / window,
+            'p50_ms': self._ms(percentile(self.latencies, 0.5)),
+            'p95_ms': self._ms(percentile(self.latencies, 0.95)),
+            'p99_ms': self._ms(percentile(self.latencies, 0.99)),
+            'max_ms': self._ms(max(self.latencies) if self.latencies else None)
+        }
+
+    @staticmethod
+    def _ms(seconds: Optional[float]) -> Optional[float]:
+        return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _fake_discord_main(conn, bots: int, guilds: int, commands: List[str], users: int):
+    """Child process: run the fake Discord and the driver until told to stop"""
+    asyncio.run(_serve(conn, bots, guilds, commands, users))
+
+
+async def _serve(conn, bots: int, guilds: int, commands: List[str], users: int):
+    from fake_discord import FakeDiscord
+
+    fake = FakeDiscord(bots, guilds)
+    base_url = await fake.start()
+    conn.send((base_url, fake.tokens))
+    driver = LoadDriver(fake, commands, users)
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            step = await loop.run_in_executor(None, conn.recv)
+            if step is None:
+                break
+            conn.send(await driver.run_step(*step))
+    finally:
+        await fake.stop()
+
+
+def sustainable(report: Dict[str, Any], slo: float) -> bool:
+    """A rate is sustainable when (almost) every command is answered within the latency SLO"""
+    return report['answered'] >= 0.99 * report['sent'] and report['p99_ms'] is not None and report['p99_ms'] <= slo * 1000
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bots', type=int, default=1)
+    parser.add_argument('--guilds', type=int, default=1000, help="Synthetic guilds per bot")
+    parser.add_argument('--users', type=int, default=100000, help="Distinct message authors (keeps per-user rate limits out of the way)")
+    parser.add_argument('--command', action='append', dest='commands', help="Message content to send; repeatable")
+    parser.add_argument('--rate', type=float, default=100, help="Commands/sec offered")
+    parser.add_argument('--ramp', help="Comma-separated rates to step through, stopping at the first unsustainable one")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per step")
+    parser.add_argument('--drain', type=float, default=5, help="Seconds to wait for replies after each step")
+    parser.add_argument('--slo', type=float, default=1.0, help="p99 reply latency (seconds) a sustainable rate must meet")
+    parser.add_argument('--cache-profile', default='full', choices=('full', 'lean'))
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+
+    from log_pipeline import setup_logging
+    setup_logging(level=args.log_level)
+
+    context = multiprocessing.get_context('spawn')
+    conn, child_conn = context.Pipe()
+    process = context.Process(
+        target=_fake_discord_main,
+        args=(child_conn, args.bots, args.guilds, args.commands or DEFAULT_COMMANDS, args.users),
+        name='fake-discord',
+        daemon=True
+    )
+    process.start()
+    base_url, tokens = conn.recv()
+
+    # Keep the economy, reminders and saved sessions of the load test out of the working directory
+    workdir = tempfile.mkdtemp(prefix='loadtest-')
+    os.environ['ECONOMY_DB'] = os.path.join(workdir, 'economy.db')
+    os.environ['REMINDERS_PATH'] = os.path.join(workdir, 'reminders')
+    os.environ['SESSIONS_PATH'] = os.path.join(workdir, 'sessions')
+
+    from fake_discord import point_discord_py_at
+    from bot_manager import BotManager
+    point_discord_py_at(base_url)
+    manager = BotManager(cache_profile=args.cache_profile)
+
+    try:
+        for token in tokens:
+            started = time.monotonic()
+            success, message = manager.start_bot(token, timeout=120)
+            print(f"{message} ({time.monotonic() - started:.1f}s, {args.guilds} guilds)")
+            if not success:
+                return 1
+
+        rates = [float(rate) for rate in args.ramp.split(',')] if args.ramp else [args.rate]
+        print(f"{'offered/s':>10} {'sent':>7} {'answered':>8} {'replies/s':>10} {'p50 ms':>8} "
+              f"{'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'cpu µs/cmd':>10}")
+        best = None
+        for rate in rates:
+            cpu = time.process_time()
+            conn.send((rate, args.duration, args.drain))
+            report = conn.recv()
+            cpu = time.process_time() - cpu
+            per_command = cpu / report['answered'] * 1e6 if report['answered'] else float('nan')
+            print(f"{rate:>10g} {report['sent']:>7} {report['answered']:>8} {report['throughput']:>10.1f} "
+                  f"{report['p50_ms']!s:>8} {report['p95_ms']!s:>8} {report['p99_ms']!s:>8} {report['max_ms']!s:>8} "
+                  f"{per_command:>10.0f}")
+            if not sustainable(report, args.slo):
+                break
+            best = report
+        if best is None:
+            print(f"No offered rate was sustainable within a p99 of {args.slo * 1000:.0f} ms")
+        else:
+            print(f"Max sustainable: {best['throughput']:.1f} commands/sec per process "
+                  f"(offered {best['rate']:g}/s, p99 {best['p99_ms']} ms)")
+        return 0
+    finally:
+        manager.stop_bot()
+        conn.send(None)
+        process.join(5)
+        # Release the stores and the calculator pool before the temporary files go away
+        manager.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
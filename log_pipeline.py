@@ -0,0 +1,175 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+# Structured fields (bot_id, guild_id, command) for records logged by the current task
+log_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar('log_context', default={})
+
+CONTEXT_FIELDS = ('bot_id', 'guild_id', 'command')
+
+# Keep 1 in N DEBUG records from these loggers; the gateway logs every event it receives
+DEFAULT_SAMPLING = 'discord.gateway=100,discord.http=10,discord.client=10,discord.state=10'
+
+_listener = None
+_lock = threading.Lock()
+
+
+def parse_sampling(value: str) -> Dict[str, int]:
+    """Parse a sampling spec like "discord.gateway=100,discord.http=10" """
+    rates = {}
+    for part in value.split(','):
+        name, _, rate = part.strip().partition('=')
+        if name and rate:
+            rates[name] = max(int(rate), 1)
+    return rates
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current task's log context onto the record (runs on the thread that logs it)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for name, value in log_context.get().items():
+            if not hasattr(record, name):
+                setattr(record, name, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Pass one in every N DEBUG records per logger, so chatty loggers can stay at DEBUG"""
+
+    def __init__(self, rates: Dict[str, int]):
+        super().__init__()
+        self.rates = rates
+        # logger name -> sampling rate, resolved from the longest matching prefix
+        self._resolved: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+
+    def _rate(self, name: str) -> int:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition('.')[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = self._rate(record.name)
+        if rate == 1:
+            return True
+        # A lost update under contention only skews the sample slightly
+        count = self._counts.get(record.name, 0)
+        self._counts[record.name] = count + 1
+        return count % rate == 0
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread without formatting them; drops records when the queue is full"""
+
+    def __init__(self, log_queue: queue.SimpleQueue, max_size: int = 10000):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so the record can cross as-is and be
+        # formatted (message, arguments and traceback) on the writer thread
+        args = record.args
+        if isinstance(args, tuple) and any(isinstance(arg, (dict, list)) for arg in args):
+            # Gateway payloads are mutated by the parsers after they are logged
+            record.args = tuple(arg.copy() if isinstance(arg, (dict, list)) else arg for arg in args)
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        # SimpleQueue.put never blocks and takes no Python-level lock
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+            return
+        self.queue.put(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the bot/guild/command fields when present"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The basicConfig layout plus the bot/guild/command fields when present"""
+
+    def __init__(self):
+        super().__init__('%(levelname)s:%(name)s:%(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = ' '.join(
+            f'{name}={getattr(record, name)}' for name in CONTEXT_FIELDS if getattr(record, name, None) is not None
+        )
+        return f'{text} [{fields}]' if fields else text
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None, sampling: Optional[str] = None,
+                  max_queue: int = 10000) -> logging.handlers.QueueListener:
+    """Route every log record through a queue to a background writer thread (idempotent)"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        level = (level or os.environ.get("LOG_LEVEL", "DEBUG")).upper()
+        fmt = fmt or os.environ.get("LOG_FORMAT", "text")
+        sampling = os.environ.get("LOG_SAMPLING", DEFAULT_SAMPLING) if sampling is None else sampling
+
+        writer = logging.StreamHandler(sys.stderr)
+        writer.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+        log_queue = queue.SimpleQueue()
+        handler = NonBlockingQueueHandler(log_queue, max_queue)
+        handler.addFilter(SamplingFilter(parse_sampling(sampling)))
+        handler.addFilter(ContextFilter())
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, writer, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
@@ -0,0 +1,190 @@
+import asyncio
+import sys
+import time
+import threading
+import traceback
+import logging
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _format_stack(frame, limit: int = 20) -> List[str]:
+    """Format a frame's stack as 'file:line in function' lines, innermost last"""
+    return [
+        f"{summary.filename}:{summary.lineno} in {summary.name}"
+        for summary in traceback.extract_stack(frame, limit=limit)
+    ]
+
+
+class LoopWatchdog:
+    """Measures event loop lag and captures the stack of whatever blocks the loop"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, thread: threading.Thread,
+                 bot_ids: Callable[[], Dict[Any, str]] = dict,
+                 interval: float = 0.1, threshold: float = 0.25, max_stalls: int = 50):
+        self.loop = loop
+        self.thread = thread
+        # Returns {bot object: bot ID} so stalls can name the bot that caused them
+        self.bot_ids = bot_ids
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls = deque(maxlen=max_stalls)
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._beat = time.monotonic()
+        self._stall = None
+        self._stop = threading.Event()
+        self._profiler = None
+        asyncio.run_coroutine_threadsafe(self._heartbeat(), loop)
+        self._monitor = threading.Thread(target=self._watch, name=f'{thread.name}-watchdog', daemon=True)
+        self._monitor.start()
+
+    async def _heartbeat(self):
+        """Tick on the loop; a late tick is loop lag"""
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self._beat = started
+            await asyncio.sleep(self.interval)
+            self.lag = max(time.monotonic() - started - self.interval, 0.0)
+            self.max_lag = max(self.max_lag, self.lag)
+
+    def _watch(self):
+        """Check the heartbeat from outside the loop and record stalls"""
+        while not self._stop.wait(self.interval / 2):
+            blocked = time.monotonic() - self._beat - self.interval
+            if blocked > self.threshold:
+                if self._stall is None:
+                    # Grab the stack while the offending callback is still running
+                    frame = sys._current_frames().get(self.thread.ident)
+                    bot_ids = self.bot_ids()
+                    owner = SamplingProfiler._owner(frame, bot_ids) if frame else None
+                    self._stall = {
+                        'bot_id': bot_ids.get(owner),
+                        'started': time.time() - blocked,
+                        'duration_ms': round(blocked * 1000),
+                        'stack': _format_stack(frame) if frame else []
+                    }
+                    self.stalls.append(self._stall)
+                    logging.warning(f"Event loop blocked for over {self.threshold * 1000:.0f} ms in {self._stall['stack'][-1:] or ['unknown']}")
+                else:
+                    self._stall['duration_ms'] = round(blocked * 1000)
+            elif self._stall is not None:
+                self._stall = None
+
+    def get_profiler(self) -> 'SamplingProfiler':
+        """Get the sampling profiler for this loop, creating it on first use"""
+        if self._profiler is None:
+            self._profiler = SamplingProfiler(self.thread)
+        return self._profiler
+
+    def forget(self, bot):
+        """Stop profiling a bot that is shutting down"""
+        if self._profiler is not None:
+            self._profiler.disable(bot)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current and peak loop lag and the most recent stalls"""
+        return {
+            'lag_ms': round(self.lag * 1000, 1),
+            'max_lag_ms': round(self.max_lag * 1000, 1),
+            'threshold_ms': round(self.threshold * 1000),
+            'stalls': list(self.stalls)
+        }
+
+    def stop(self):
+        self._stop.set()
+        if self._profiler is not None:
+            self._profiler.stop()
+
+
+class SamplingProfiler:
+    """Samples the loop thread's stack and attributes samples to the bot running at the time"""
+
+    def __init__(self, thread: threading.Thread, interval: float = 0.005, max_stacks: int = 500):
+        self.thread = thread
+        self.interval = interval
+        self.max_stacks = max_stacks
+        # bot object -> Counter of collapsed stacks
+        self.samples: Dict[Any, Counter] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def enable(self, bot):
+        with self._lock:
+            self.samples.setdefault(bot, Counter())
+            # A sampler told to stop may still be finishing its last sample; it gets
+            # replaced, with its own stop event, rather than reused
+            if self._sampler is None or not self._sampler.is_alive() or self._stop.is_set():
+                self._stop = threading.Event()
+                self._sampler = threading.Thread(
+                    target=self._sample, args=(self._stop,), name=f'{self.thread.name}-profiler', daemon=True
+                )
+                self._sampler.start()
+
+    def disable(self, bot) -> Optional[Counter]:
+        with self._lock:
+            samples = self.samples.pop(bot, None)
+            if not self.samples:
+                self._stop.set()
+            return samples
+
+    def is_enabled(self, bot) -> bool:
+        return bot in self.samples
+
+    @staticmethod
+    def _owner(frame, bots):
+        """Find which profiled bot a stack belongs to"""
+        while frame is not None:
+            local = frame.f_locals
+            owner = local.get('self')
+            ctx = local.get('ctx')
+            try:
+                if owner in bots:
+                    return owner
+                if ctx is not None and getattr(ctx, 'bot', None) in bots:
+                    return ctx.bot
+            except TypeError:
+                # Unhashable locals can't be a bot
+                pass
+            frame = frame.f_back
+        return None
+
+    def _sample(self, stop: threading.Event):
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread.ident)
+            if frame is None:
+                continue
+            with self._lock:
+                bots = set(self.samples)
+            owner = self._owner(frame, bots)
+            if owner is None:
+                continue
+            stack = ';'.join(
+                f"{summary.name} ({summary.filename.rsplit('/', 1)[-1]}:{summary.lineno})"
+                for summary in traceback.extract_stack(frame, limit=30)
+            )
+            with self._lock:
+                counter = self.samples.get(owner)
+                if counter is None:
+                    continue
+                if stack in counter or len(counter) < self.max_stacks:
+                    counter[stack] += 1
+
+    def get_profile(self, bot, limit: int = 20) -> Dict[str, Any]:
+        """Get the most frequently sampled stacks for a bot"""
+        with self._lock:
+            counter = Counter(self.samples.get(bot, ()))
+        total = sum(counter.values())
+        return {
+            'enabled': self.is_enabled(bot),
+            'interval_ms': self.interval * 1000,
+            'samples': total,
+            'stacks': [
+                {'stack': stack, 'samples': count, 'share': round(count / total, 3)}
+                for stack, count in counter.most_common(limit)
+            ]
+        }
+
+    def stop(self):
+        self._stop.set()
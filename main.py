@@ -1,4 +1,37 @@
-from app import app
+import argparse
+import signal
+import sys
 
-if __name__ == '__main__':
+
+def __getattr__(name):
+    # `uvicorn main:asgi_app` looks the app up after importing this module; building it
+    # on demand keeps `python main.py --startup-report` from importing what it measures
+    if name in ('app', 'asgi_app'):
+        from app import app
+        from asgi import asgi_app
+        globals().update(app=app, asgi_app=asgi_app)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the web app")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="Print how long the app takes to import and serve its first page, then exit")
+    parser.add_argument('--limit', type=int, default=15, help="Rows per section of the startup report")
+    args = parser.parse_args(argv)
+
+    if args.startup_report:
+        from startup import startup_report
+        print(startup_report(limit=args.limit))
+        return 0
+
+    from app import app
+    # Exit normally on SIGTERM so the bot manager's exit hook saves resumable gateway sessions
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     app.run(host='0.0.0.0', port=5000, debug=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
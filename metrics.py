@@ -0,0 +1,216 @@
+import re
+import time
+import bisect
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import aiohttp
+
+# Upper bounds (seconds) shared by every latency histogram, so memory per series is fixed
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# (metric name, sorted label pairs)
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# Snowflakes and tokens in REST paths become placeholders to keep label cardinality bounded
+ROUTE_ID = re.compile(r'/\d{5,}')
+ROUTE_TOKEN = re.compile(r'/(webhooks/\{id\}|interactions/\{id\})/[^/]+')
+
+HELP = {
+    'botrun_commands_total': ('counter', 'Commands invoked'),
+    'botrun_command_errors_total': ('counter', 'Commands that raised an error'),
+    'botrun_commands_not_found_total': ('counter', 'Prefixed messages naming an unknown command'),
+    'botrun_commands_rate_limited_total': ('counter', 'Commands rejected by the per-user/per-guild rate limiter'),
+    'botrun_command_latency_seconds': ('histogram', 'Command handling time including argument conversion'),
+    'botrun_http_requests_total': ('counter', 'Discord REST requests by status'),
+    'botrun_http_rate_limited_total': ('counter', 'Discord REST responses with status 429'),
+    'botrun_http_latency_seconds': ('histogram', 'Discord REST request latency'),
+    'botrun_outbound_coalesced_total': ('counter', 'Queued replies merged into a single message'),
+    'botrun_outbound_dropped_total': ('counter', 'Low-priority sends dropped because they went stale'),
+}
+
+
+def _key(name: str, labels: Dict[str, str]) -> SeriesKey:
+    return name, tuple(sorted(labels.items()))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        # One slot per bucket plus +Inf
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, counts: List[int], total: float, count: int):
+        for index, value in enumerate(counts):
+            self.counts[index] += value
+        self.sum += total
+        self.count += count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                if index == len(LATENCY_BUCKETS):
+                    return lower
+                upper = LATENCY_BUCKETS[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return LATENCY_BUCKETS[-1]
+
+
+class Metrics:
+    """Process-wide counters and histograms for the bots in one BotManager"""
+
+    def __init__(self):
+        self.counters: Dict[SeriesKey, float] = {}
+        self.histograms: Dict[SeriesKey, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def record_command(self, bot_id: str, command: str, elapsed: float, failed: bool):
+        """Record one command invocation"""
+        self.inc('botrun_commands_total', bot_id=bot_id, command=command)
+        self.observe('botrun_command_latency_seconds', elapsed, bot_id=bot_id, command=command)
+        if failed:
+            self.inc('botrun_command_errors_total', bot_id=bot_id, command=command)
+
+    def http_trace(self, bot_id: str) -> 'aiohttp.TraceConfig':
+        """Build an aiohttp trace config that times a bot's Discord REST calls"""
+        # Imported here so the web app can serve /metrics without loading aiohttp
+        import aiohttp
+
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.started = time.perf_counter()
+
+        async def on_request_end(session, context, params):
+            self._record_http(bot_id, context, params.method, params.url.path, str(params.response.status))
+
+        async def on_request_exception(session, context, params):
+            self._record_http(bot_id, context, params.method, params.url.path, 'error')
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        return trace
+
+    def _record_http(self, bot_id: str, context, method: str, path: str, status: str):
+        elapsed = time.perf_counter() - getattr(context, 'started', time.perf_counter())
+        route = ROUTE_TOKEN.sub(r'/\1/{token}', ROUTE_ID.sub('/{id}', path.split('/v10', 1)[-1]))
+        self.inc('botrun_http_requests_total', bot_id=bot_id, method=method, route=route, status=status)
+        self.observe('botrun_http_latency_seconds', elapsed, bot_id=bot_id, method=method, route=route)
+        if status == '429':
+            self.inc('botrun_http_rate_limited_total', bot_id=bot_id, method=method, route=route)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy the current values into plain data that can cross process boundaries"""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': {
+                    key: (list(histogram.counts), histogram.sum, histogram.count)
+                    for key, histogram in self.histograms.items()
+                }
+            }
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add up snapshots from several worker processes"""
+    counters: Dict[SeriesKey, float] = {}
+    histograms: Dict[SeriesKey, Histogram] = {}
+    for snapshot in snapshots:
+        for key, value in snapshot['counters'].items():
+            counters[key] = counters.get(key, 0) + value
+        for key, data in snapshot['histograms'].items():
+            histograms.setdefault(key, Histogram()).merge(*data)
+    return {
+        'counters': counters,
+        'histograms': {
+            key: (histogram.counts, histogram.sum, histogram.count) for key, histogram in histograms.items()
+        }
+    }
+
+
+def _format_labels(labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = tuple(labels) + extra
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def render_prometheus(snapshot: Dict[str, Any]) -> str:
+    """Render a snapshot in the Prometheus text exposition format"""
+    families: Dict[str, List[str]] = {}
+
+    for (name, labels), value in sorted(snapshot['counters'].items()):
+        families.setdefault(name, []).append(f'{name}{_format_labels(labels)} {value:g}')
+
+    quantile_lines = {}
+    for (name, labels), (counts, total, count) in sorted(snapshot['histograms'].items()):
+        lines = families.setdefault(name, [])
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS + (float('inf'),), counts):
+            cumulative += bucket_count
+            le = '+Inf' if bound == float('inf') else f'{bound:g}'
+            lines.append(f'{name}_bucket{_format_labels(labels, (("le", le),))} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {total:g}')
+        lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+        # Precomputed p50/p95/p99 for dashboards that don't aggregate buckets
+        histogram = Histogram()
+        histogram.merge(counts, total, count)
+        quantile_name = f'{name[:-len("_seconds")]}_quantile_seconds'
+        for q in QUANTILES:
+            value = histogram.quantile(q)
+            if value is not None:
+                quantile_lines.setdefault(quantile_name, []).append(
+                    f'{quantile_name}{_format_labels(labels, (("quantile", f"{q:g}"),))} {value:g}'
+                )
+
+    output = []
+    for name, lines in families.items():
+        kind, text = HELP.get(name, ('untyped', name))
+        output.append(f'# HELP {name} {text}')
+        output.append(f'# TYPE {name} {kind}')
+        output.extend(lines)
+    for name, lines in quantile_lines.items():
+        output.append(f'# HELP {name} Estimated latency quantiles from the histogram buckets')
+        output.append(f'# TYPE {name} gauge')
+        output.extend(lines)
+    return '\n'.join(output) + '\n'
@@ -0,0 +1,240 @@
+import asyncio
+import re
+import time
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+# Discord limits that bound how many queued sends fit in one message
+MAX_CONTENT_LENGTH = 2000
+MAX_EMBEDS = 10
+MAX_EMBED_CHARACTERS = 6000
+
+# Per-channel rate-limit buckets we track from response headers
+CHANNEL_ROUTE = re.compile(r'/channels/(\d+)/messages(/\d+/reactions)?')
+
+HIGH, LOW = 0, 1
+
+
+class OutboundItem:
+    """One queued send waiting for its channel's rate-limit bucket"""
+
+    __slots__ = ('priority', 'bucket', 'call', 'channel', 'kind', 'payload', 'future', 'deadline')
+
+    def __init__(self, priority: int, bucket: Tuple[str, int], call: Callable[[], Awaitable],
+                 channel: Any = None, kind: Optional[str] = None, payload: Any = None,
+                 deadline: Optional[float] = None):
+        self.priority = priority
+        self.bucket = bucket
+        self.call = call
+        self.channel = channel
+        # 'text' and 'embeds' sends can be merged with queued sends of the same kind
+        self.kind = kind
+        self.payload = payload
+        self.future = asyncio.get_running_loop().create_future()
+        self.deadline = deadline
+
+
+class ChannelLane:
+    """Pending sends for one channel; replies always go before decorative sends"""
+
+    __slots__ = ('high', 'low', 'task')
+
+    def __init__(self):
+        self.high = deque()
+        self.low = deque()
+        self.task = None
+
+    def __bool__(self) -> bool:
+        return bool(self.high or self.low)
+
+    def pop(self) -> OutboundItem:
+        return self.high.popleft() if self.high else self.low.popleft()
+
+
+class OutboundQueue:
+    """Per-channel outbound queue for one bot that paces sends by Discord's bucket headers"""
+
+    def __init__(self, bot_id: str, metrics=None, low_priority_ttl: float = 5.0, max_low_priority: int = 20):
+        self.bot_id = bot_id
+        self.metrics = metrics
+        self.low_priority_ttl = low_priority_ttl
+        self.max_low_priority = max_low_priority
+        self.lanes: Dict[int, ChannelLane] = {}
+        # (kind, channel ID) -> (remaining requests, monotonic reset time)
+        self.buckets: Dict[Tuple[str, int], Tuple[int, float]] = {}
+
+    def _count(self, name: str):
+        if self.metrics is not None:
+            self.metrics.inc(name, bot_id=self.bot_id)
+
+    def track(self, trace):
+        """Read rate-limit headers from every REST response traced by `trace`"""
+        async def on_request_end(session, context, params):
+            match = CHANNEL_ROUTE.search(params.url.path)
+            if match is None:
+                return
+            headers = params.response.headers
+            bucket = ('reactions' if match.group(2) else 'messages', int(match.group(1)))
+            try:
+                if params.response.status == 429:
+                    remaining, reset_after = 0, float(headers.get('Retry-After', 1))
+                elif 'X-RateLimit-Remaining' in headers:
+                    remaining = int(headers['X-RateLimit-Remaining'])
+                    reset_after = float(headers.get('X-RateLimit-Reset-After', 0))
+                else:
+                    return
+            except ValueError:
+                return
+            self.buckets[bucket] = (remaining, time.monotonic() + reset_after)
+
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+    def _bucket_wait(self, bucket: Tuple[str, int]) -> float:
+        """Seconds until the bucket has room again"""
+        state = self.buckets.get(bucket)
+        if state is None:
+            return 0.0
+        remaining, reset_at = state
+        if remaining > 0:
+            return 0.0
+        return max(reset_at - time.monotonic(), 0.0)
+
+    def _enqueue(self, channel_id: int, item: OutboundItem) -> asyncio.Future:
+        lane = self.lanes.get(channel_id)
+        if lane is None:
+            lane = self.lanes[channel_id] = ChannelLane()
+        if item.priority == HIGH:
+            lane.high.append(item)
+        else:
+            lane.low.append(item)
+            if len(lane.low) > self.max_low_priority:
+                # Under a flood the oldest decorations are the least useful
+                self._drop(lane.low.popleft())
+        if lane.task is None or lane.task.done():
+            lane.task = asyncio.get_running_loop().create_task(self._drain(channel_id, lane))
+        return item.future
+
+    def _drop(self, item: OutboundItem):
+        self._count('botrun_outbound_dropped_total')
+        if not item.future.done():
+            item.future.set_result(None)
+
+    def send(self, channel: discord.abc.Messageable, content: Optional[str] = None, *,
+             coalesce: bool = True, **kwargs) -> asyncio.Future:
+        """Queue a reply; resolves to the sent Message"""
+        channel_id = getattr(channel, 'id', None) or id(channel)
+        # Merged sends resolve to one shared Message, so callers that edit, delete or
+        # react to the result pass coalesce=False to get a message of their own
+        kind = payload = None
+        if coalesce and not kwargs and content is not None:
+            kind, payload = 'text', str(content)
+        elif coalesce and set(kwargs) == {'embed'} and content is None and kwargs['embed'] is not None:
+            kind, payload = 'embeds', [kwargs['embed']]
+
+        item = OutboundItem(HIGH, ('messages', channel_id), lambda: channel.send(content, **kwargs), channel, kind, payload)
+        return self._enqueue(channel_id, item)
+
+    def add_reactions(self, message: discord.Message, *emojis) -> asyncio.Future:
+        """Queue decorative reactions; they yield to replies and are dropped once stale"""
+        channel_id = message.channel.id
+        deadline = time.monotonic() + self.low_priority_ttl
+        futures = []
+        for emoji in emojis:
+            item = OutboundItem(LOW, ('reactions', channel_id), lambda emoji=emoji: message.add_reaction(emoji), deadline=deadline)
+            futures.append(self._enqueue(channel_id, item))
+        return asyncio.gather(*futures)
+
+    def _coalesce(self, item: OutboundItem, queue: deque) -> List[OutboundItem]:
+        """Merge queued sends of the same kind into `item`; returns the merged items"""
+        merged = []
+        channel = item.channel
+        if item.kind == 'text':
+            text = item.payload
+            while queue and queue[0].kind == 'text' and len(text) + 1 + len(queue[0].payload) <= MAX_CONTENT_LENGTH:
+                text = f'{text}\n{queue[0].payload}'
+                merged.append(queue.popleft())
+            if merged:
+                item.call = lambda: channel.send(text)
+        elif item.kind == 'embeds':
+            embeds = list(item.payload)
+            size = sum(len(embed) for embed in embeds)
+            while (queue and queue[0].kind == 'embeds' and len(embeds) < MAX_EMBEDS
+                   and size + len(queue[0].payload[0]) <= MAX_EMBED_CHARACTERS):
+                size += len(queue[0].payload[0])
+                embeds.extend(queue[0].payload)
+                merged.append(queue.popleft())
+            if merged:
+                item.call = lambda: channel.send(embeds=embeds)
+        return merged
+
+    async def _drain(self, channel_id: int, lane: ChannelLane):
+        """Send everything queued for one channel, pacing each bucket"""
+        try:
+            while lane:
+                item = lane.pop()
+                if item.priority == LOW and time.monotonic() > item.deadline:
+                    self._drop(item)
+                    continue
+
+                wait = self._bucket_wait(item.bucket)
+                if wait > 0:
+                    if item.priority == LOW and time.monotonic() + wait > item.deadline:
+                        self._drop(item)
+                        continue
+                    await asyncio.sleep(wait)
+                    if item.priority == LOW and lane.high:
+                        # A reply arrived while we were waiting; it goes first
+                        lane.low.appendleft(item)
+                        continue
+
+                merged = self._coalesce(item, lane.high) if item.priority == HIGH else []
+                if merged:
+                    self._count('botrun_outbound_coalesced_total')
+
+                remaining, reset_at = self.buckets.get(item.bucket, (1, 0.0))
+                if remaining > 0:
+                    # Spend the bucket locally until the response headers refresh it
+                    self.buckets[item.bucket] = (remaining - 1, reset_at)
+                try:
+                    result = await item.call()
+                except Exception as e:
+                    if item.priority == LOW:
+                        # Nobody waits on decorative sends, so just log the failure
+                        logging.error(f"Error adding reaction for bot {self.bot_id}: {e}")
+                        item.future.set_result(None)
+                        continue
+                    for pending in [item] + merged:
+                        if not pending.future.done():
+                            pending.future.set_exception(e)
+                    continue
+                for pending in [item] + merged:
+                    if not pending.future.done():
+                        pending.future.set_result(result)
+        finally:
+            if not lane and self.lanes.get(channel_id) is lane:
+                del self.lanes[channel_id]
+
+
+class QueuedContext(commands.Context):
+    """Command context whose replies go through the bot's outbound queue"""
+
+    async def send(self, content=None, *, coalesce: bool = True, **kwargs):
+        """Queue a reply; pass coalesce=False when the returned Message is edited, deleted or reacted to"""
+        outbound = getattr(self.bot, 'outbound', None)
+        if outbound is None:
+            return await super().send(content, **kwargs)
+        return await outbound.send(self.channel, content, coalesce=coalesce, **kwargs)
+
+    async def add_reactions(self, message: discord.Message, *emojis):
+        """Add decorative reactions at low priority without holding up the command"""
+        outbound = getattr(self.bot, 'outbound', None)
+        if outbound is None:
+            for emoji in emojis:
+                await message.add_reaction(emoji)
+            return
+        outbound.add_reactions(message, *emojis)
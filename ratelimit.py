@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# (rate, per): allow `rate` commands every `per` seconds
+Limit = Tuple[int, float]
+BucketKey = Tuple[Optional[int], Optional[int], str]
+
+
+class RateLimiter:
+    """Token buckets per (guild, user, command) and per (guild, command), sized by command category"""
+
+    def __init__(self, limits: Dict[str, Dict[str, Limit]], categories: Dict[str, str]):
+        # key -> (tokens, updated at, warned); least recently touched first
+        self._buckets: Dict[BucketKey, Tuple[float, float, bool]] = OrderedDict()
+        self.configure(limits, categories)
+
+    def configure(self, limits: Dict[str, Dict[str, Limit]], categories: Dict[str, str]):
+        """Swap in new limits while keeping the current buckets"""
+        # category -> {'user': (rate, per), 'guild': (rate, per)}
+        self.limits = limits
+        # command name -> category
+        self.categories = categories
+        self._longest = max(
+            (per for limit in limits.values() for _, per in limit.values()),
+            default=0.0
+        )
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _tokens(self, key: BucketKey, limit: Limit, now: float) -> Tuple[float, bool]:
+        """Get a bucket's refilled token count and warned flag"""
+        state = self._buckets.get(key)
+        if state is None:
+            return float(limit[0]), False
+        rate, per = limit
+        tokens, updated, warned = state
+        tokens = min(float(rate), tokens + (now - updated) * rate / per)
+        # A refilled bucket starts a new window, so the next rejection warns again
+        return tokens, warned and tokens < rate
+
+    def _store(self, key: BucketKey, tokens: float, now: float, warned: bool):
+        self._buckets[key] = (tokens, now, warned)
+        self._buckets.move_to_end(key)
+
+    def _expire(self, now: float):
+        """Drop buckets that have been idle long enough to be full again"""
+        buckets = self._buckets
+        while buckets:
+            key, (_, updated, _) = next(iter(buckets.items()))
+            if now - updated < self._longest:
+                break
+            del buckets[key]
+
+    def hit(self, guild_id: Optional[int], user_id: int, command: str) -> Tuple[float, bool]:
+        """Take a token for a command; returns (seconds to wait or 0, whether to warn the user)"""
+        limit = self.limits.get(self.categories.get(command))
+        if not limit:
+            return 0.0, False
+
+        now = time.monotonic()
+        self._expire(now)
+
+        checks = [((guild_id, user_id, command), limit['user'])] if 'user' in limit else []
+        if guild_id is not None and 'guild' in limit:
+            checks.append(((guild_id, None, command), limit['guild']))
+
+        states = [(key, bucket_limit, *self._tokens(key, bucket_limit, now)) for key, bucket_limit in checks]
+        for key, (rate, per), tokens, warned in states:
+            if tokens < 1:
+                # Only the first rejection in the rejecting bucket's window gets a reply, so
+                # a full guild bucket warns once rather than once per user
+                self._store(key, tokens, now, True)
+                return (1 - tokens) * per / rate, not warned
+
+        for key, _, tokens, warned in states:
+            self._store(key, tokens - 1, now, warned)
+        return 0.0, False
@@ -0,0 +1,310 @@
+"""Replay a gateway capture (see capture.py) into a BotManager bot, offline.
+
+    python replay.py gateway_capture.jsonl                   # real time
+    python replay.py gateway_capture.jsonl --speed 0         # as fast as the fake gateway can send
+    python replay.py gateway_capture.jsonl --speed 0 --save run.json
+    python replay.py gateway_capture.jsonl --speed 0 --baseline run.json --threshold 0.8
+
+The captured events of one bot are sent, in order, by a local fake Discord (see
+fake_discord.py) running in a child process; replies land on its REST API. READY
+and the GUILD_CREATEs after it go out as soon as the bot IDENTIFYs, so the timed
+part is the traffic that followed startup. Captures that start mid-session get a
+synthetic READY and stub guilds for every guild their events mention. Hashed
+message content keeps the command name, so commands dispatch the same way but
+see a digest instead of their original arguments, and mostly end in their usage
+errors. Capture with GATEWAY_CAPTURE_ARGUMENTS=shape to keep mentions, numbers
+and arithmetic, so replayed commands take the same paths as the originals.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from capture import capture_files, read_capture
+
+# Events that arrive while a bot starts, before it handles traffic
+STARTUP_EVENTS = ('READY', 'GUILD_CREATE')
+# Session bookkeeping the fake gateway answers by itself
+SKIPPED_EVENTS = ('RESUMED',)
+
+
+def load_events(path: str, bot_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read the captured events of one bot (the first one in the capture by default)"""
+    events = []
+    for entry in read_capture(capture_files(path)):
+        if bot_id is None:
+            bot_id = entry['b']
+        if entry['b'] == bot_id and entry['e'] not in SKIPPED_EVENTS:
+            events.append(entry)
+    return events
+
+
+def split_startup(events: List[Dict[str, Any]]) -> int:
+    """Count the leading READY/GUILD_CREATE events"""
+    count = 0
+    while count < len(events) and events[count]['e'] in STARTUP_EVENTS:
+        count += 1
+    return count
+
+
+def stub_guilds(fake_bot, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Build GUILD_CREATE payloads for the guilds and channels a capture's events refer to"""
+    channels: Dict[str, set] = {}
+    for entry in events:
+        data = entry['d']
+        if isinstance(data, dict) and data.get('guild_id'):
+            found = channels.setdefault(data['guild_id'], set())
+            if data.get('channel_id'):
+                found.add(data['channel_id'])
+    guilds = []
+    for guild_id, channel_ids in channels.items():
+        guild = fake_bot.guild_payload(int(guild_id))
+        guild['roles'][0]['id'] = guild_id
+        guild['channels'] = [
+            {'id': channel_id, 'type': 0, 'name': f'channel-{index}', 'position': index, 'permission_overwrites': []}
+            for index, channel_id in enumerate(sorted(channel_ids))
+        ]
+        guilds.append(guild)
+    return guilds
+
+
+class Replayer:
+    """Sends a bot's captured events through the fake gateway"""
+
+    def __init__(self, fake, events: List[Dict[str, Any]]):
+        self.fake = fake
+        self.startup = split_startup(events)
+        self.events = events
+        self.identified = asyncio.Event()
+        self.bot = None
+        fake.on_identify = self._on_identify
+
+    async def _on_identify(self, fake_bot):
+        """Send the startup burst, rewritten to point at the fake gateway"""
+        self.bot = fake_bot
+        startup = self.events[:self.startup]
+        if not any(entry['e'] == 'READY' for entry in startup):
+            guilds = stub_guilds(fake_bot, self.events)
+            startup = [{'e': 'READY', 'd': {'guilds': [{'id': guild['id'], 'unavailable': True} for guild in guilds]}}]
+            startup += [{'e': 'GUILD_CREATE', 'd': guild} for guild in guilds]
+        for entry in startup:
+            await self.fake.dispatch(fake_bot, entry['e'], self._rewrite(fake_bot, entry['e'], entry['d']))
+        self.identified.set()
+
+    def _rewrite(self, fake_bot, event: str, data: Any) -> Any:
+        if event != 'READY':
+            return data
+        ready = {'v': 10, 'user': fake_bot.user, 'private_channels': [], 'relationships': [], **data}
+        ready.update(
+            session_id=fake_bot.session_id,
+            resume_gateway_url=self.fake.gateway_url,
+            application={'id': str(fake_bot.id), 'flags': 0}
+        )
+        return ready
+
+    async def run(self, speed: float) -> Dict[str, Any]:
+        """Send the events after startup, paced by their capture times divided by `speed` (0 = no pacing)"""
+        traffic = self.events[self.startup:]
+        started = time.monotonic()
+        first = traffic[0]['t'] if traffic else 0.0
+        for index, entry in enumerate(traffic):
+            if speed > 0:
+                delay = started + (entry['t'] - first) / speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif index % 100 == 0:
+                # Let the fake gateway answer heartbeats between bursts
+                await asyncio.sleep(0)
+            await self.fake.dispatch(self.bot, entry['e'], self._rewrite(self.bot, entry['e'], entry['d']))
+        return {'started': started, 'sent': len(traffic), 'send_seconds': time.monotonic() - started,
+                'sequence': self.bot.sequence}
+
+
+def _fake_discord_main(conn, path: str, bot_id: Optional[str]):
+    """Child process: serve the fake Discord and replay the capture when told to"""
+    asyncio.run(_serve(conn, path, bot_id))
+
+
+async def _serve(conn, path: str, bot_id: Optional[str]):
+    from fake_discord import FakeDiscord, make_token
+
+    events = load_events(path, bot_id)
+    if not events:
+        conn.send(None)
+        return
+    bot_id = events[0]['b']
+    fake = FakeDiscord(bots=0)
+    # Bot IDs derived from a hash (not an application ID) get a synthetic one
+    fake.add_bot(make_token(int(bot_id) if bot_id.isdigit() else 800000000000000000))
+    replayer = Replayer(fake, events)
+    replies = []
+    fake.on_reply = lambda channel_id, count, now: replies.append((count, now))
+    base_url = await fake.start()
+    conn.send((base_url, fake.tokens[0], bot_id, len(events), replayer.startup))
+    loop = asyncio.get_running_loop()
+    try:
+        speed = await loop.run_in_executor(None, conn.recv)
+        if speed is None:
+            return
+        await replayer.identified.wait()
+        replies.clear()
+        report = await replayer.run(speed)
+        conn.send(report)
+        # The parent says when the bot caught up; whatever replies came by then are counted
+        await loop.run_in_executor(None, conn.recv)
+        report['replies'] = sum(count for count, _ in replies)
+        report['last_reply'] = replies[-1][1] if replies else None
+        report['rest_requests'] = fake.requests
+        conn.send(report)
+    finally:
+        await fake.stop()
+
+
+def wait_for_sequence(sequence: int, bot, quiet: float, timeout: float) -> Optional[float]:
+    """Wait until the bot has handled gateway event `sequence`; returns when, or None on timeout"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        ws = bot.ws
+        if ws is not None and ws.sequence is not None and ws.sequence >= sequence:
+            caught_up = time.monotonic()
+            # Commands run as tasks after dispatch; give their replies time to land
+            time.sleep(quiet)
+            return caught_up
+        time.sleep(0.01)
+    return None
+
+
+def command_stats(metrics) -> Dict[str, Dict[str, Any]]:
+    """Per-command counts and latency percentiles recorded during the replay"""
+    stats: Dict[str, Dict[str, Any]] = {}
+    for (name, labels), value in list(metrics.counters.items()):
+        if name == 'botrun_commands_total':
+            stats.setdefault(dict(labels)['command'], {})['count'] = int(value)
+    for (name, labels), histogram in list(metrics.histograms.items()):
+        if name == 'botrun_command_latency_seconds':
+            entry = stats.setdefault(dict(labels)['command'], {})
+            for q in (0.5, 0.99):
+                value = histogram.quantile(q)
+                entry[f'p{round(q * 100)}_ms'] = None if value is None else round(value * 1000, 2)
+    return stats
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """List the rates that dropped below `threshold` times the baseline"""
+    regressions = []
+    for metric in ('events_per_sec', 'replies_per_sec'):
+        before, after = baseline.get(metric), result.get(metric)
+        if before and after is not None and after < before * threshold:
+            regressions.append(f"{metric}: {after:.1f} vs {before:.1f} ({after / before:.2f}x)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('capture', help="Capture file; its rotated parts (.1, .2, ...) are read first")
+    parser.add_argument('--bot', help="Bot ID to replay (default: the first one in the capture)")
+    parser.add_argument('--speed', type=float, default=1.0, help="1 = real time, 10 = ten times faster, 0 = no pacing")
+    parser.add_argument('--quiet', type=float, default=1.0, help="Seconds to wait for replies after the last event")
+    parser.add_argument('--timeout', type=float, default=600, help="Give up when the bot hasn't caught up by then")
+    parser.add_argument('--cache-profile', default='full', choices=('full', 'lean'))
+    parser.add_argument('--save', help="Write the results to this JSON file")
+    parser.add_argument('--baseline', help="Fail when throughput drops against this results file")
+    parser.add_argument('--threshold', type=float, default=0.8, help="Allowed fraction of the baseline throughput")
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+
+    from log_pipeline import setup_logging
+    setup_logging(level=args.log_level)
+
+    context = multiprocessing.get_context('spawn')
+    conn, child_conn = context.Pipe()
+    process = context.Process(target=_fake_discord_main, args=(child_conn, args.capture, args.bot),
+                              name='fake-discord', daemon=True)
+    process.start()
+    handshake = conn.recv()
+    if handshake is None:
+        print(f"No events to replay in {args.capture}")
+        process.join(5)
+        return 1
+    base_url, token, bot_id, total, startup = handshake
+
+    workdir = tempfile.mkdtemp(prefix='replay-')
+    os.environ['ECONOMY_DB'] = os.path.join(workdir, 'economy.db')
+    os.environ['REMINDERS_PATH'] = os.path.join(workdir, 'reminders')
+    os.environ['SESSIONS_PATH'] = os.path.join(workdir, 'sessions')
+    # Replaying must not record itself
+    os.environ.pop('GATEWAY_CAPTURE_PATH', None)
+
+    from fake_discord import point_discord_py_at
+    from bot_manager import BotManager, bot_id_from_token
+    point_discord_py_at(base_url)
+    manager = BotManager(cache_profile=args.cache_profile)
+
+    try:
+        started = time.monotonic()
+        success, message = manager.start_bot(token, timeout=120)
+        print(f"{message} ({time.monotonic() - started:.1f}s, {startup} startup events)")
+        if not success:
+            conn.send(None)
+            return 1
+        bot = manager.bots[bot_id_from_token(token)].bot
+
+        cpu = time.process_time()
+        conn.send(args.speed)
+        sent = conn.recv()
+        caught_up = wait_for_sequence(sent['sequence'], bot, args.quiet, args.timeout)
+        cpu = time.process_time() - cpu
+        conn.send(True)
+        report = conn.recv()
+        if caught_up is None:
+            print(f"The bot did not process all {sent['sent']} events within {args.timeout:g}s")
+            return 1
+
+        seconds = max(caught_up - report['started'], 1e-9)
+        reply_seconds = max((report['last_reply'] or caught_up) - report['started'], seconds)
+        result = {
+            'bot_id': bot_id,
+            'events': report['sent'],
+            'speed': args.speed,
+            'seconds': round(seconds, 3),
+            'events_per_sec': round(report['sent'] / seconds, 1),
+            'replies': report['replies'],
+            'replies_per_sec': round(report['replies'] / reply_seconds, 1),
+            'rest_requests': report['rest_requests'],
+            'cpu_us_per_event': round(cpu / report['sent'] * 1e6) if report['sent'] else None,
+            'commands': command_stats(manager.metrics)
+        }
+        print(f"Replayed {result['events']} of {total} events of bot {bot_id} in {result['seconds']}s "
+              f"(sender took {report['send_seconds']:.3f}s)")
+        print(f"{result['events_per_sec']} events/s, {result['replies']} replies ({result['replies_per_sec']}/s), "
+              f"{result['rest_requests']} REST requests, {result['cpu_us_per_event']} CPU µs/event")
+        for command, stats in sorted(result['commands'].items(), key=lambda item: -item[1].get('count', 0)):
+            print(f"  {command:<16} {stats.get('count', 0):>7} p50 {stats.get('p50_ms')!s:>8} ms  p99 {stats.get('p99_ms')!s:>8} ms")
+
+        if args.save:
+            with open(args.save, 'w') as f:
+                json.dump(result, f, indent=2)
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressions = compare(result, json.load(f), args.threshold)
+            for regression in regressions:
+                print(f"REGRESSION {regression}")
+            if regressions:
+                return 1
+        return 0
+    finally:
+        manager.stop_bot()
+        process.join(5)
+        # Release the stores and the calculator pool before the temporary files go away
+        manager.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
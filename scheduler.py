@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import time
+import atexit
+from collections import namedtuple
+from typing import Awaitable, Callable, Dict, List, Set
+
+# Compact reminder record; `due` is a wall-clock timestamp so it survives restarts
+Reminder = namedtuple('Reminder', 'due seq bot_id channel_id user_id kind text')
+
+# deliver(bot_id, reminders) sends the reminders and returns the ones that
+# could not be delivered because the bot is not online
+DeliverCallback = Callable[[str, List[Reminder]], Awaitable[List[Reminder]]]
+
+
+class ReminderScheduler:
+    """Single heap-based timer for every pending reminder, persisted to disk one file per bot"""
+
+    def __init__(self, deliver: DeliverCallback, path: str = 'reminders', save_delay: float = 2.0):
+        self.deliver = deliver
+        self.path = path
+        self.save_delay = save_delay
+        self._heap: List[Reminder] = []
+        # Reminders for bots that are not online yet, keyed by bot ID
+        self._parked: Dict[str, List[Reminder]] = {}
+        # Bots whose file has been read. A process only reads the files of the bots it
+        # runs, so supervisor workers never load (and fire) each other's reminders
+        self._loaded: Set[str] = set()
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._task = None
+        # Bots whose reminders changed since their file was last written
+        self._dirty: Set[str] = set()
+        self._last_save = 0.0
+        atexit.register(self.save)
+
+    def __len__(self) -> int:
+        return len(self._heap) + sum(len(reminders) for reminders in self._parked.values())
+
+    def _file(self, bot_id: str) -> str:
+        return os.path.join(self.path, f'{bot_id}.json')
+
+    def _load(self, bot_id: str):
+        """Load a bot's persisted reminders once; they stay parked until the bot is ready"""
+        if bot_id in self._loaded:
+            return
+        self._loaded.add(bot_id)
+        try:
+            with open(self._file(bot_id)) as f:
+                rows = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not load reminders of bot {bot_id}: {e}")
+            return
+        parked = self._parked.setdefault(bot_id, [])
+        for due, channel_id, user_id, kind, text in rows:
+            parked.append(Reminder(due, next(self._seq), bot_id, channel_id, user_id, kind, text))
+
+    def _snapshot(self) -> Dict[str, list]:
+        """Get the pending reminders of every changed bot as compact JSON rows"""
+        rows: Dict[str, list] = {bot_id: [] for bot_id in self._dirty}
+        reminders = list(self._heap)
+        for parked in list(self._parked.values()):
+            reminders.extend(parked)
+        for r in reminders:
+            if r.bot_id in rows:
+                rows[r.bot_id].append((r.due, r.channel_id, r.user_id, r.kind, r.text))
+        self._dirty = set()
+        self._last_save = time.monotonic()
+        return rows
+
+    def _write(self, rows: Dict[str, list]):
+        """Write each bot's reminder rows to its file atomically"""
+        for bot_id, bot_rows in rows.items():
+            path = self._file(bot_id)
+            try:
+                if not bot_rows:
+                    if os.path.exists(path):
+                        os.remove(path)
+                    continue
+                os.makedirs(self.path, exist_ok=True)
+                tmp_path = f'{path}.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump(bot_rows, f, separators=(',', ':'))
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logging.error(f"Could not save reminders of bot {bot_id}: {e}")
+
+    def save(self):
+        """Write the pending reminders of every changed bot to disk"""
+        self._write(self._snapshot())
+
+    def _ensure_running(self):
+        """Start the timer task on the current event loop"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def schedule(self, bot_id: str, channel_id: int, user_id: int, delay: float, kind: str, text: str) -> Reminder:
+        """Add a reminder that fires after `delay` seconds (call from the bot loop)"""
+        self._ensure_running()
+        # Its file is rewritten from what is in memory, so what it already holds must be too
+        self._load(bot_id)
+        reminder = Reminder(time.time() + delay, next(self._seq), bot_id, channel_id, user_id, kind, text)
+        heapq.heappush(self._heap, reminder)
+        was_dirty = bool(self._dirty)
+        self._dirty.add(bot_id)
+        if self._heap[0] is reminder or not was_dirty:
+            # The new reminder is due before whatever the timer is waiting for,
+            # or the timer has to start counting down to the next save
+            self._wakeup.set()
+        return reminder
+
+    def resume(self, bot_id: str):
+        """Activate the parked reminders of a bot that just became ready"""
+        self._ensure_running()
+        self._load(bot_id)
+        parked = self._parked.pop(bot_id, None)
+        if parked:
+            for reminder in parked:
+                heapq.heappush(self._heap, reminder)
+            self._wakeup.set()
+
+    async def _run(self):
+        """Sleep until the next reminder is due, then fire every due reminder in one batch"""
+        while True:
+            timeout = self._heap[0].due - time.time() if self._heap else None
+            if self._dirty:
+                save_in = self._last_save + self.save_delay - time.monotonic()
+                timeout = save_in if timeout is None else min(timeout, save_in)
+            if timeout is None or timeout > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            now = time.time()
+            due: Dict[str, List[Reminder]] = {}
+            while self._heap and self._heap[0].due <= now:
+                reminder = heapq.heappop(self._heap)
+                due.setdefault(reminder.bot_id, []).append(reminder)
+
+            for bot_id, reminders in due.items():
+                self._dirty.add(bot_id)
+                try:
+                    undelivered = await self.deliver(bot_id, reminders)
+                except Exception as e:
+                    logging.error(f"Error delivering reminders for bot {bot_id}: {e}")
+                    continue
+                if undelivered:
+                    self._parked.setdefault(bot_id, []).extend(undelivered)
+
+            if self._dirty and time.monotonic() - self._last_save >= self.save_delay:
+                # Serialize on the loop, write to disk off it
+                await asyncio.to_thread(self._write, self._snapshot())
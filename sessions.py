@@ -0,0 +1,189 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+import discord
+import yarl
+from discord.gateway import DiscordWebSocket
+
+# Closing with 1000 tells Discord to end the session; any other code keeps it resumable
+RESUMABLE_CLOSE_CODE = 4000
+
+# client -> {shard ID: saved session} waiting for that shard's first connection
+_pending: 'weakref.WeakKeyDictionary[discord.Client, Dict[int, Dict[str, Any]]]' = weakref.WeakKeyDictionary()
+# client -> {shard ID: current gateway socket}
+_sockets: 'weakref.WeakKeyDictionary[discord.Client, Dict[int, DiscordWebSocket]]' = weakref.WeakKeyDictionary()
+# client -> callback(shard ID, socket) run for every new gateway socket, before READY arrives
+_watchers: 'weakref.WeakKeyDictionary[discord.Client, Callable[[int, DiscordWebSocket], None]]' = weakref.WeakKeyDictionary()
+
+
+def _saved_gateway(client: discord.Client) -> Optional[yarl.URL]:
+    """The gateway the client's pending sessions live on, if they all share one"""
+    gateways = {shard['gateway'] for shard in _pending.get(client, {}).values()}
+    return yarl.URL(gateways.pop()) if len(gateways) == 1 else None
+
+
+def track_sockets(client: discord.Client):
+    """Hook one client's gateway connections for session tracking, saved-session RESUME and watchers"""
+    # Only this client's HTTP client and connection state are wrapped; other clients
+    # in the process connect exactly as discord.py does by itself
+    http = client.http
+    state = client._connection
+    ws_connect = http.ws_connect
+    update_references = state._update_references
+
+    async def connect(url: str, **kwargs):
+        # A saved session has to be resumed on the gateway that issued it
+        gateway = _saved_gateway(client)
+        if gateway is not None:
+            url = str(gateway.with_query(yarl.URL(url).query))
+        return await ws_connect(url, **kwargs)
+
+    def register(ws: DiscordWebSocket):
+        # DiscordWebSocket.from_client calls this after setting up the socket and before
+        # it sends IDENTIFY (or RESUME, when discord.py itself reconnects)
+        update_references(ws)
+        shard_id = ws.shard_id or 0
+        saved = _pending.get(client, {}).pop(shard_id, None)
+        if saved is not None and ws.session_id is None:
+            ws.session_id = saved['session_id']
+            ws.sequence = saved['sequence']
+            ws.gateway = yarl.URL(saved['gateway'])
+            # If Discord rejects the session discord.py falls back to IDENTIFY by itself
+            ws.identify = ws.resume
+        _sockets.setdefault(client, {})[shard_id] = ws
+        watcher = _watchers.get(client)
+        if watcher is not None:
+            watcher(shard_id, ws)
+
+    http.ws_connect = connect
+    state._update_references = register
+
+
+def resume_on_connect(client: discord.Client, shards: Dict[int, Dict[str, Any]]):
+    """Make the client's first connection of each shard RESUME a saved session"""
+    _pending[client] = dict(shards)
+
+
+def watch_sockets(client: discord.Client, callback: Callable[[int, DiscordWebSocket], None]):
+    """Call `callback(shard_id, ws)` for each gateway socket the client opens from now on"""
+    _watchers[client] = callback
+
+
+def gateway_sockets(client: discord.Client) -> Dict[int, DiscordWebSocket]:
+    """Get the latest gateway socket of each of the client's shards"""
+    return dict(_sockets.get(client, {}))
+
+
+def keep_sessions(client: discord.Client):
+    """Make the client's next close leave its gateway sessions resumable"""
+    for ws in _sockets.get(client, {}).values():
+        close = ws.close
+
+        async def close_keeping_session(code: int = RESUMABLE_CLOSE_CODE, close=close):
+            await close(code=RESUMABLE_CLOSE_CODE)
+
+        ws.close = close_keeping_session
+
+
+def session_state(client: discord.Client) -> Dict[int, Dict[str, Any]]:
+    """Get the resumable session of every shard that completed a handshake"""
+    shards = {}
+    for shard_id, ws in _sockets.get(client, {}).items():
+        # An invalidated session has its ID cleared
+        if ws.session_id and ws.sequence is not None:
+            shards[shard_id] = {
+                'session_id': ws.session_id,
+                'sequence': ws.sequence,
+                'gateway': str(ws.gateway)
+            }
+    return shards
+
+
+async def restore_guilds(client: discord.Client, guild_ids: Iterable[int], concurrency: int = 4) -> int:
+    """Refill the guild cache over REST after a RESUME, which doesn't replay GUILD_CREATE"""
+    # Uses ConnectionState internals, which is why discord.py is pinned in requirements.txt
+    state = client._connection
+    semaphore = asyncio.Semaphore(concurrency)
+    restored = 0
+
+    async def restore(guild_id: int):
+        nonlocal restored
+        if state._get_guild(guild_id) is not None:
+            return
+        async with semaphore:
+            try:
+                data = await client.http.get_guild(guild_id, with_counts=True)
+                data['channels'] = await client.http.get_all_guild_channels(guild_id)
+                data['members'] = [await client.http.get_member(guild_id, client.user.id)]
+            except discord.HTTPException as e:
+                # Most likely the bot was removed from the guild while it was offline
+                logging.error(f"Could not restore guild {guild_id}: {e}")
+                return
+            except (aiohttp.ClientError, OSError) as e:
+                # Connection trouble, or the bot is being closed
+                logging.error(f"Could not restore guild {guild_id}: {e!r}")
+                return
+        data.setdefault('member_count', data.get('approximate_member_count'))
+        # A GUILD_CREATE may have arrived while we were waiting on REST
+        if state._get_guild(guild_id) is None:
+            state._add_guild_from_data(data)
+            restored += 1
+
+    await asyncio.gather(*(restore(guild_id) for guild_id in guild_ids))
+    return restored
+
+
+class SessionStore:
+    """Gateway sessions and guild snapshots saved on graceful shutdown, one file per bot"""
+
+    def __init__(self, path: str = 'sessions', max_age: float = 60.0):
+        self.path = path
+        # Discord only keeps a disconnected session resumable for a short while
+        self.max_age = max_age
+
+    def _file(self, bot_id: str) -> str:
+        return os.path.join(self.path, f'{bot_id}.json')
+
+    def save(self, bot_id: str, shards: Dict[int, Dict[str, Any]], shard_count: Optional[int],
+             info: Dict[str, Any], guild_ids: List[int]):
+        """Write a bot's sessions and guild snapshot atomically"""
+        path = self._file(bot_id)
+        tmp_path = f'{path}.tmp'
+        entry = {
+            'saved_at': time.time(),
+            'shard_count': shard_count,
+            'shards': {str(shard_id): shard for shard_id, shard in shards.items()},
+            'info': info,
+            'guilds': guild_ids
+        }
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Could not save gateway session of bot {bot_id}: {e}")
+
+    def take(self, bot_id: str) -> Optional[Dict[str, Any]]:
+        """Remove and return a bot's saved sessions if they are still fresh enough to resume"""
+        path = self._file(bot_id)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            # A session can only be resumed once
+            os.remove(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not load gateway session of bot {bot_id}: {e}")
+            return None
+        if time.time() - entry.get('saved_at', 0) > self.max_age:
+            return None
+        entry['shards'] = {int(shard_id): shard for shard_id, shard in entry.get('shards', {}).items()}
+        return entry
@@ -0,0 +1,141 @@
+import json
+import re
+import subprocess
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from status_events import StatusBroadcaster
+
+async def _no_job(job_id, wait=None):
+    return None
+
+
+# What the manager methods the web pages poll return while no bot was ever started
+IDLE_CALLS: Dict[str, Callable[..., Any]] = {
+    'get_status': lambda bot_id=None: (
+        {'bot_id': bot_id, 'running': False, 'info': {}} if bot_id is not None
+        else {'running': False, 'info': {}, 'has_token': False, 'bots': []}
+    ),
+    'is_running': lambda bot_id=None: False,
+    'get_job': lambda job_id, wait=None: None,
+    'get_job_async': _no_job,
+    'stop_bot': lambda bot_id=None, wait=5: (False, "No bot is currently running"),
+    'get_loop_status': lambda: {'lag_ms': 0.0, 'max_lag_ms': 0.0, 'stalls': []},
+    'set_profiling': lambda bot_id, enabled: (False, "Bot is not running"),
+    'get_profile': lambda bot_id, limit=20: None,
+    'get_metrics': lambda: {'counters': {}, 'histograms': {}},
+    'get_capture_status': lambda: {'capturing': False},
+    'stop_capture': lambda: (False, "No capture is running"),
+}
+
+
+class LazyManager:
+    """Stands in for the bot manager until it is needed, so the web app starts without importing discord.py"""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._manager = None
+        self._lock = threading.Lock()
+        # Status streams may subscribe before the manager exists
+        self.status_events = StatusBroadcaster()
+
+    @property
+    def loaded(self) -> bool:
+        return self._manager is not None
+
+    def get(self) -> Any:
+        """Build the manager on first use"""
+        with self._lock:
+            if self._manager is None:
+                manager = self._factory()
+                manager.status_events = self.status_events
+                self._manager = manager
+            return self._manager
+
+    def preload(self):
+        """Build the manager on a background thread, so the first bot start doesn't pay for the imports"""
+        threading.Thread(target=self.get, name='manager-preload', daemon=True).start()
+
+    def __getattr__(self, name: str) -> Any:
+        if self._manager is None and name in IDLE_CALLS:
+            return IDLE_CALLS[name]
+        return getattr(self.get(), name)
+
+
+# Run in a fresh interpreter so nothing is imported yet
+_MEASURE = '''
+import json, sys, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+client = {module}.app.test_client()
+client.get('/')
+served = time.perf_counter()
+early = 'discord' in sys.modules
+import bot_manager, catalog
+catalog.get_catalog()
+loaded = time.perf_counter()
+print(json.dumps({{
+    'import': imported - started,
+    'first_request': served - imported,
+    'deferred': loaded - served,
+    'discord_loaded_early': early
+}}))
+'''
+_IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """Parse `python -X importtime` output into (module, self µs, cumulative µs, depth)"""
+    imports = []
+    for line in output.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match:
+            imports.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return imports
+
+
+def startup_report(module: str = 'app', limit: int = 15) -> str:
+    """Time importing the web app and serving its first page, with an import-time breakdown"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _MEASURE.format(module=module)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return f"Could not measure startup of {module}:\n{result.stderr[-2000:]}"
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(result.stderr)
+
+    # importtime lists a module right after everything it imported, so the app's
+    # imports are the nested entries just before its own line
+    end = next((index for index, entry in enumerate(imports) if entry[0] == module and entry[3] == 0), len(imports))
+    start = end
+    while start > 0 and imports[start - 1][3] > 0:
+        start -= 1
+    app_imports = imports[start:end + 1]
+    direct = sorted(
+        ((name, cumulative_us) for name, _, cumulative_us, depth in app_imports if depth == 1),
+        key=lambda item: -item[1]
+    )
+    packages: Dict[str, int] = {}
+    for name, self_us, _, _ in app_imports:
+        root = name.split('.')[0]
+        packages[root] = packages.get(root, 0) + self_us
+
+    lines = [
+        f"Startup of {module}",
+        f"  {'import ' + module:<34} {timings['import'] * 1000:8.1f} ms",
+        f"  {'first request to /':<34} {timings['first_request'] * 1000:8.1f} ms",
+        f"  {'deferred to first bot start':<34} {timings['deferred'] * 1000:8.1f} ms  (discord.py, handlers, catalog)",
+    ]
+    if timings['discord_loaded_early']:
+        lines.append("  WARNING: discord.py was imported before any bot started")
+    lines.append(f"Imports of {module} (cumulative)")
+    lines += [f"  {name:<34} {us / 1000:8.1f} ms" for name, us in direct[:limit]]
+    lines.append("By package (self time)")
+    lines += [
+        f"  {name:<34} {us / 1000:8.1f} ms"
+        for name, us in sorted(packages.items(), key=lambda item: -item[1])[:limit]
+    ]
+    return '\n'.join(lines)
@@ -4,6 +4,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeTokenToggle();
     initializeFormValidation();
     initializeStatusUpdater();
+    initializeStartJobWatcher();
 });
 
 function initializeTokenToggle() {
@@ -68,8 +69,53 @@ function initializeFormValidation() {
 }
 
 function initializeStatusUpdater() {
-    // Update bot status every 10 seconds
-    setInterval(updateBotStatus, 10000);
+    if (!window.EventSource) {
+        // Fall back to polling on browsers without Server-Sent Events
+        setInterval(updateBotStatus, 10000);
+        return;
+    }
+    
+    // The server pushes a new status whenever a bot connects, disconnects or joins/leaves a server;
+    // EventSource reconnects on its own if the stream drops
+    const source = new EventSource('/bot_status/stream');
+    source.onmessage = function(event) {
+        updateStatusDisplay(JSON.parse(event.data));
+    };
+    source.onerror = function() {
+        // A refused stream (the server caps how many are open) isn't retried; poll instead
+        if (source.readyState === EventSource.CLOSED) {
+            setInterval(updateBotStatus, 10000);
+        }
+    };
+}
+
+function initializeStartJobWatcher() {
+    // Follow a bot start job until the gateway handshake finishes
+    const statusCard = document.getElementById('status-card');
+    const jobId = statusCard ? statusCard.dataset.startJob : null;
+    if (jobId) {
+        waitForStartJob(jobId);
+    }
+}
+
+function waitForStartJob(jobId) {
+    fetch(`/jobs/${jobId}?wait=10`)
+        .then(response => response.json())
+        .then(job => {
+            if (job.state === 'pending') {
+                waitForStartJob(jobId);
+                return;
+            }
+            if (job.state === 'ready') {
+                showAlert(`Bot started successfully in ${job.elapsed}s!`, 'success');
+            } else {
+                showAlert(`Error starting bot: ${job.error || 'unknown error'}`, 'error');
+            }
+            updateBotStatus();
+        })
+        .catch(error => {
+            console.error('Error fetching start job:', error);
+        });
 }
 
 function validateToken(token) {
@@ -89,10 +135,15 @@ function validateToken(token) {
     return true;
 }
 
-function stopBot() {
-    if (confirm('Are you sure you want to stop the bot?')) {
+function stopBot(botId) {
+    const prompt = botId ? 'Are you sure you want to stop this bot?' : 'Are you sure you want to stop all bots?';
+    if (confirm(prompt)) {
         const stopForm = document.getElementById('stop-form');
+        const botIdInput = document.getElementById('stop-bot-id');
         if (stopForm) {
+            if (botIdInput) {
+                botIdInput.value = botId || '';
+            }
             showAlert('Stopping bot...', 'info');
             stopForm.submit();
         }
@@ -121,27 +172,35 @@ function updateStatusDisplay(status) {
         statusBadge.innerHTML = `<i class="fas fa-circle pulse me-1" style="font-size: 0.7em;"></i>${status.running ? 'Running' : 'Stopped'}`;
         
         // Update card body content
-        if (status.running && status.info && Object.keys(status.info).length > 0) {
-            cardBody.innerHTML = `
-                <div class="row g-3">
+        const runningBots = (status.bots || []).filter(bot => bot.running);
+        if (runningBots.length > 0) {
+            cardBody.innerHTML = runningBots.map((bot, index) => `
+                <div class="row g-3${index < runningBots.length - 1 ? ' mb-3 pb-3 border-bottom' : ''}">
                     <div class="col-md-6">
                         <small class="text-muted">Bot Name</small>
-                        <div class="fw-bold">${status.info.name || 'Unknown'}</div>
+                        <div class="fw-bold">${bot.info.name || 'Unknown'}</div>
                     </div>
                     <div class="col-md-6">
                         <small class="text-muted">Bot ID</small>
-                        <div class="fw-bold font-monospace">${status.info.id || 'Unknown'}</div>
+                        <div class="fw-bold font-monospace">${bot.info.id || 'Unknown'}</div>
                     </div>
                     <div class="col-md-6">
                         <small class="text-muted">Servers</small>
-                        <div class="fw-bold">${status.info.guilds || 0}</div>
+                        <div class="fw-bold">${bot.info.guilds || 0}</div>
                     </div>
                     <div class="col-md-6">
                         <small class="text-muted">Total Users</small>
-                        <div class="fw-bold">${status.info.users || 0}</div>
+                        <div class="fw-bold">${bot.info.users || 0}</div>
+                    </div>
+                    ${renderCache(bot)}
+                    ${renderShards(bot)}
+                    <div class="col-12 text-end">
+                        <button type="button" class="btn btn-sm btn-outline-danger" onclick="stopBot('${bot.bot_id}')">
+                            <i class="fas fa-stop me-1"></i>Stop
+                        </button>
                     </div>
                 </div>
-            `;
+            `).join('');
         } else {
             cardBody.innerHTML = `
                 <p class="text-muted mb-0">
@@ -153,35 +212,55 @@ function updateStatusDisplay(status) {
     }
     
     // Update form state
-    const tokenInput = document.getElementById('token');
-    const toggleButton = document.getElementById('toggle-token');
     const form = document.getElementById('token-form');
     
-    if (tokenInput && toggleButton && form) {
-        const isRunning = status.running;
-        tokenInput.disabled = isRunning;
-        toggleButton.disabled = isRunning;
-        
-        // Update form buttons
+    if (form) {
+        // The token form stays enabled so more bots can be started
         const submitButton = form.querySelector('button[type="submit"]');
         if (submitButton) {
-            if (isRunning) {
-                submitButton.innerHTML = '<i class="fas fa-stop me-2"></i>Stop Bot';
-                submitButton.className = 'btn btn-danger';
-                submitButton.type = 'button';
-                submitButton.onclick = stopBot;
-            } else {
-                submitButton.innerHTML = '<i class="fas fa-play me-2"></i>Start Bot';
-                submitButton.className = 'btn btn-primary';
-                submitButton.type = 'submit';
-                submitButton.onclick = null;
-            }
             submitButton.disabled = false;
             submitButton.classList.remove('loading');
         }
+        
+        const stopAllButton = document.getElementById('stop-all-button');
+        if (stopAllButton) {
+            stopAllButton.style.display = status.running ? '' : 'none';
+        }
     }
 }
 
+function renderCache(bot) {
+    if (!bot.cache) {
+        return '';
+    }
+    return `
+        <div class="col-12">
+            <small class="text-muted">Cache (${bot.cache.profile})</small>
+            <div class="small">
+                ${bot.cache.members_cached} of ${bot.cache.members_total} members cached
+                (${bot.cache.members_skipped} fetched on demand) · ${bot.cache.messages_cached} messages
+            </div>
+        </div>
+    `;
+}
+
+function renderShards(bot) {
+    if (!bot.shards || bot.shards.length === 0) {
+        return '';
+    }
+    const badges = bot.shards.map(shard => `
+        <span class="badge ${shard.connected ? 'bg-success' : 'bg-secondary'} me-1">
+            #${shard.id} · ${shard.latency_ms !== null ? shard.latency_ms : '—'} ms · ${shard.guilds} servers · ${shard.reconnects} reconnects
+        </span>
+    `).join('');
+    return `
+        <div class="col-12">
+            <small class="text-muted">Shards (${bot.shard_count})</small>
+            <div class="font-monospace small">${badges}</div>
+        </div>
+    `;
+}
+
 function showAlert(message, type) {
     // Create alert element
     const alertDiv = document.createElement('div');
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import logging
+from typing import Callable, List
+
+
+class StatusBroadcaster:
+    """Version counter that wakes status stream subscribers whenever bot status changes"""
+
+    def __init__(self):
+        self.version = 0
+        self._condition = threading.Condition()
+        self._listeners: List[Callable[[], None]] = []
+
+    def subscribe(self, listener: Callable[[], None]):
+        """Call `listener` (from the publishing thread) after every change"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[], None]):
+        """Stop calling a listener added with subscribe()"""
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def publish(self):
+        """Signal that status changed; safe to call from any thread"""
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+        for listener in list(self._listeners):
+            try:
+                listener()
+            except Exception as e:
+                logging.error(f"Error in status listener: {e}")
+
+    def wait(self, since: int, timeout: float) -> int:
+        """Block until the version moves past `since` or the timeout expires; returns the version"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != since, timeout)
+            return self.version
+
+    async def changed(self, since: int, timeout: float) -> int:
+        """Like wait(), but awaited on an event loop instead of blocking a thread"""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def wake():
+            loop.call_soon_threadsafe(event.set)
+
+        self.subscribe(wake)
+        try:
+            if self.version == since:
+                await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.unsubscribe(wake)
+        return self.version
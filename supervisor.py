@@ -0,0 +1,519 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import itertools
+import hashlib
+import bisect
+import logging
+import atexit
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Tuple, Dict, Any, Optional, List
+
+from bot_tokens import bot_id_from_token
+from metrics import merge_snapshots
+from status_events import StatusBroadcaster
+
+
+def _worker_main(conn):
+    """Entry point of a worker process: serve BotManager calls over the pipe"""
+    from bot_manager import BotManager
+    from log_pipeline import setup_logging
+
+    # Spawned workers start with unconfigured logging
+    setup_logging()
+    manager = BotManager()
+    send_lock = threading.Lock()
+
+    def push_status_change():
+        # Unsolicited messages carry no request ID
+        with send_lock:
+            conn.send((None, True, 'status'))
+
+    manager.status_events.subscribe(push_status_change)
+
+    def handle(request_id, method, args, kwargs):
+        try:
+            if method.startswith('_'):
+                raise AttributeError(f"Method {method} is not callable over IPC")
+            result = getattr(manager, method)(*args, **kwargs)
+            reply = (request_id, True, result)
+        except Exception as e:
+            reply = (request_id, False, f"{type(e).__name__}: {e}")
+        with send_lock:
+            conn.send(reply)
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            # The control plane went away
+            break
+        if message is None:
+            break
+        # Calls like start_bot block for a while, so each gets its own thread
+        threading.Thread(target=handle, args=message, daemon=True).start()
+
+    # The control plane is shutting down or restarting, so keep the sessions resumable
+    manager.close()
+
+
+class WorkerCrashed(Exception):
+    """Raised for calls that were pending when a worker process died"""
+
+
+class Worker:
+    """Control-plane handle for one bot worker process"""
+
+    def __init__(self, index: int, context):
+        self.index = index
+        self.bots: Dict[str, str] = {}  # bot_id -> token
+        self._pending: Dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn,),
+            name=f'bot-worker-{index}'
+        )
+        self.process.start()
+        child_conn.close()
+        self.on_exit = None
+        self.on_status = None
+        self.reader = threading.Thread(target=self._read_replies, name=f'bot-worker-{index}-reader', daemon=True)
+        self.reader.start()
+
+    def is_alive(self) -> bool:
+        """Check if the worker process is still running"""
+        return self.process.is_alive()
+
+    def call(self, method: str, *args, timeout: float = 30, **kwargs) -> Any:
+        """Call a BotManager method in the worker and wait for the result"""
+        future = Future()
+        with self._lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            try:
+                self.conn.send((request_id, method, args, kwargs))
+            except (OSError, ValueError) as e:
+                del self._pending[request_id]
+                raise WorkerCrashed(f"Worker {self.index} is not reachable: {e}")
+        try:
+            return future.result(timeout=timeout)
+        finally:
+            # A timed-out call's reply, if it ever comes, is dropped by the reader
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    def _read_replies(self):
+        """Resolve pending calls as replies arrive from the worker"""
+        while True:
+            try:
+                request_id, ok, result = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            if request_id is None:
+                # Status change pushed by the worker
+                if self.on_status:
+                    self.on_status()
+                continue
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(result))
+
+        # The pipe closed: fail everything still waiting on this worker
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(WorkerCrashed(f"Worker {self.index} exited"))
+        if self.on_exit:
+            self.on_exit(self)
+
+    def shutdown(self, timeout: float = 10):
+        """Ask the worker to stop its bots and exit"""
+        self.on_exit = None
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class BotSupervisor:
+    """Spreads bots across worker processes, each running its own BotManager"""
+
+    PLACEMENTS = ('least_loaded', 'hash')
+    VIRTUAL_NODES = 64
+    MAX_JOBS = 256
+
+    def __init__(self, workers: int = None, placement: str = 'least_loaded'):
+        if placement not in self.PLACEMENTS:
+            raise ValueError(f"Unknown placement strategy: {placement}")
+        self.worker_count = workers or multiprocessing.cpu_count()
+        self.placement = placement
+        self.workers: List[Worker] = []
+        self.jobs: Dict[str, Worker] = OrderedDict()
+        # bot_id -> start options (sharding, cache profile), reused when a crashed worker's bots are restarted
+        self.bot_options: Dict[str, Dict[str, Any]] = {}
+        self._context = multiprocessing.get_context('spawn')
+        self._lock = threading.RLock()
+        self._ring = self._build_ring()
+        self._closed = False
+        # Bumped whenever any worker reports a status change
+        self.status_events = StatusBroadcaster()
+
+    def _build_ring(self) -> List[Tuple[int, int]]:
+        """Build the consistent-hash ring of (point, worker index)"""
+        ring = []
+        for index in range(self.worker_count):
+            for replica in range(self.VIRTUAL_NODES):
+                ring.append((self._hash(f'{index}:{replica}'), index))
+        ring.sort()
+        return ring
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+    def _ensure_workers(self):
+        """Start the worker processes on first use"""
+        # Workers are started lazily so spawned children that re-import the
+        # web app never try to start workers of their own
+        with self._lock:
+            if self.workers or self._closed:
+                return
+            for index in range(self.worker_count):
+                self.workers.append(self._spawn(index))
+            atexit.register(self.shutdown)
+
+    def _spawn(self, index: int) -> Worker:
+        worker = Worker(index, self._context)
+        worker.on_exit = self._on_worker_exit
+        worker.on_status = self.status_events.publish
+        logging.info(f"Started bot worker {index} (pid {worker.process.pid})")
+        return worker
+
+    def _on_worker_exit(self, worker: Worker):
+        """Replace a crashed worker and restart the bots it was hosting"""
+        with self._lock:
+            if self._closed or self.workers[worker.index] is not worker:
+                return
+            logging.error(f"Bot worker {worker.index} exited unexpectedly, restarting it")
+            replacement = self._spawn(worker.index)
+            self.workers[worker.index] = replacement
+        self.status_events.publish()
+
+        for bot_id, token in worker.bots.items():
+            threading.Thread(target=self._restart_bot, args=(replacement, bot_id, token), daemon=True).start()
+
+    def _restart_bot(self, worker: Worker, bot_id: str, token: str):
+        try:
+            success, message = worker.call('start_bot', token, timeout=45, **self.bot_options.get(bot_id, {}))
+        except Exception as e:
+            success, message = False, str(e)
+        if success:
+            worker.bots[bot_id] = token
+        else:
+            logging.error(f"Could not restart bot {bot_id} on worker {worker.index}: {message}")
+
+    def _pick_worker(self, bot_id: str) -> Worker:
+        """Choose the worker a new bot should be placed on"""
+        if self.placement == 'hash':
+            point = self._hash(bot_id)
+            position = bisect.bisect(self._ring, (point, self.worker_count)) % len(self._ring)
+            return self.workers[self._ring[position][1]]
+        return min(self.workers, key=lambda worker: len(worker.bots))
+
+    def _find_worker(self, bot_id: str) -> Optional[Worker]:
+        """Find the worker hosting a bot"""
+        for worker in self.workers:
+            if bot_id in worker.bots:
+                return worker
+        return None
+
+    def start_bot_async(self, token: str, **options) -> Tuple[bool, str, Optional[str]]:
+        """Schedule a bot start on one of the worker processes and return its job ID"""
+        if not token or len(token.strip()) < 50:
+            return False, "Invalid token format", None
+
+        token = token.strip()
+        bot_id = bot_id_from_token(token)
+        self._ensure_workers()
+
+        with self._lock:
+            # A bot that was placed before goes back to the same worker,
+            # which refuses the start if it is still running there
+            worker = self._find_worker(bot_id) or self._pick_worker(bot_id)
+            # Claimed before the call so a concurrent start of the same bot lands here too
+            previous_token, previous_options = worker.bots.get(bot_id), self.bot_options.get(bot_id, {})
+            worker.bots[bot_id] = token
+            self.bot_options[bot_id] = options
+
+        try:
+            success, message, job_id = worker.call('start_bot_async', token, **options)
+        except Exception as e:
+            logging.error(f"Error starting bot on worker {worker.index}: {e}")
+            success, message, job_id = False, f"Error: {str(e)}", None
+        with self._lock:
+            if success:
+                self.jobs[job_id] = worker
+                while len(self.jobs) > self.MAX_JOBS:
+                    self.jobs.popitem(last=False)
+            elif previous_token is None:
+                # A rejected start must not be restarted after a crash or count towards placement
+                worker.bots.pop(bot_id, None)
+                self.bot_options.pop(bot_id, None)
+            else:
+                # The bot was already placed here (e.g. still running); keep that placement
+                worker.bots[bot_id], self.bot_options[bot_id] = previous_token, previous_options
+        return success, message, job_id
+
+    def get_job(self, job_id: str, wait: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Get a start job's state from the worker running it"""
+        worker = self.jobs.get(job_id)
+        if worker is None:
+            return None
+        try:
+            job = worker.call('get_job', job_id, wait=wait, timeout=(wait or 0) + 5)
+        except Exception as e:
+            logging.error(f"Could not get job {job_id} from worker {worker.index}: {e}")
+            return None
+        if job and job['state'] == 'failed':
+            # Forget the placement, or a restarted worker would start the bot again
+            worker.bots.pop(job['bot_id'], None)
+            self.bot_options.pop(job['bot_id'], None)
+        return job
+
+    async def get_job_async(self, job_id: str, wait: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Like get_job, awaited from an event loop; the worker pipe is read on an executor thread"""
+        return await asyncio.to_thread(self.get_job, job_id, wait)
+
+    def start_bot(self, token: str, timeout: float = 30, **options) -> Tuple[bool, str]:
+        """Start a Discord bot on a worker and wait until it is ready or fails"""
+        success, message, job_id = self.start_bot_async(token, **options)
+        if not success:
+            return False, message
+
+        job = self.get_job(job_id, wait=timeout)
+        if job is None:
+            return False, "Lost track of the bot start"
+        if job['state'] == 'ready':
+            return True, "Bot started successfully"
+        if job['state'] == 'failed':
+            return False, f"Failed to start bot: {job['error']}"
+        return True, "Bot is still connecting"
+
+    def stop_bot(self, bot_id: Optional[str] = None, wait: float = 5) -> Tuple[bool, str]:
+        """Stop one bot, or every bot on every worker when no ID is given"""
+        if bot_id is not None:
+            worker = self._find_worker(bot_id)
+            if worker is None:
+                return False, "No bot is currently running"
+            try:
+                return worker.call('stop_bot', bot_id, wait=wait, timeout=wait + 5)
+            except Exception as e:
+                return False, f"Error stopping bot: {str(e)}"
+            finally:
+                worker.bots.pop(bot_id, None)
+                self.bot_options.pop(bot_id, None)
+
+        stopped = 0
+        errors = []
+        for worker in list(self.workers):
+            if not worker.bots:
+                continue
+            try:
+                success, message = worker.call('stop_bot', wait=wait, timeout=wait + 5)
+                if success:
+                    stopped += len(worker.bots)
+                else:
+                    errors.append(message)
+            except Exception as e:
+                errors.append(str(e))
+            finally:
+                for bot_id in worker.bots:
+                    self.bot_options.pop(bot_id, None)
+                worker.bots.clear()
+
+        if errors:
+            return False, f"Error stopping bot: {'; '.join(errors)}"
+        if not stopped:
+            return False, "No bot is currently running"
+        return True, "Bot stopped successfully" if stopped == 1 else f"{stopped} bots stopped successfully"
+
+    def reload_commands(self, timeout: float = 30) -> Tuple[bool, str]:
+        """Reload the command handlers in every worker"""
+        errors = []
+        for worker in list(self.workers):
+            try:
+                success, message = worker.call('reload_commands', timeout=timeout + 5)
+            except Exception as e:
+                success, message = False, str(e)
+            if not success:
+                errors.append(f"worker {worker.index}: {message}")
+        if errors:
+            return False, f"Error reloading commands: {'; '.join(errors)}"
+        return True, f"Reloaded commands on {len(self.workers)} workers"
+
+    def get_loop_status(self) -> Dict[str, Any]:
+        """Get event loop lag and recent stalls for every worker"""
+        workers = []
+        for worker in list(self.workers):
+            try:
+                status = worker.call('get_loop_status', timeout=5) if worker.is_alive() else {}
+            except Exception as e:
+                logging.error(f"Could not get loop status from worker {worker.index}: {e}")
+                status = {}
+            status['worker'] = worker.index
+            workers.append(status)
+        return {'workers': workers}
+
+    def set_profiling(self, bot_id: str, enabled: bool) -> Tuple[bool, str]:
+        """Turn the sampling profiler on or off for one bot on its worker"""
+        worker = self._find_worker(bot_id)
+        if worker is None:
+            return False, "Bot is not running"
+        try:
+            return worker.call('set_profiling', bot_id, enabled, timeout=5)
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+    def get_profile(self, bot_id: str, limit: int = 20) -> Optional[Dict[str, Any]]:
+        """Get the hottest sampled stacks of a bot from its worker"""
+        worker = self._find_worker(bot_id)
+        if worker is None:
+            return None
+        try:
+            return worker.call('get_profile', bot_id, limit, timeout=5)
+        except Exception as e:
+            logging.error(f"Could not get profile for bot {bot_id}: {e}")
+            return None
+
+    def start_capture(self, path: Optional[str] = None, hash_content: Optional[bool] = None) -> Tuple[bool, str]:
+        """Start a gateway capture in every running worker, one file per worker"""
+        root, ext = os.path.splitext(path or os.environ.get("GATEWAY_CAPTURE_PATH", "gateway_capture.jsonl"))
+        errors = []
+        started = 0
+        for worker in list(self.workers):
+            try:
+                success, message = worker.call('start_capture', f"{root}-{worker.index}{ext}", hash_content, timeout=5)
+            except Exception as e:
+                success, message = False, str(e)
+            if success:
+                started += 1
+            else:
+                errors.append(f"worker {worker.index}: {message}")
+        if errors:
+            return False, f"Error starting capture: {'; '.join(errors)}"
+        if not started:
+            return False, "No worker is running"
+        return True, f"Capturing gateway events on {started} workers to {root}-<worker>{ext}"
+
+    def stop_capture(self) -> Tuple[bool, str]:
+        """Stop the gateway capture in every worker"""
+        messages = []
+        for worker in list(self.workers):
+            try:
+                success, message = worker.call('stop_capture', timeout=15)
+            except Exception as e:
+                success, message = False, str(e)
+            if success:
+                messages.append(f"worker {worker.index}: {message}")
+        if not messages:
+            return False, "No capture is running"
+        return True, '; '.join(messages)
+
+    def get_capture_status(self) -> Dict[str, Any]:
+        """Get the capture status of every worker"""
+        workers = []
+        for worker in list(self.workers):
+            try:
+                status = worker.call('get_capture_status', timeout=5) if worker.is_alive() else {'capturing': False}
+            except Exception as e:
+                logging.error(f"Could not get capture status from worker {worker.index}: {e}")
+                status = {'capturing': False}
+            status['worker'] = worker.index
+            workers.append(status)
+        return {'capturing': any(status['capturing'] for status in workers), 'workers': workers}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get command and REST metrics summed over every worker"""
+        snapshots = []
+        for worker in list(self.workers):
+            if not worker.is_alive():
+                continue
+            try:
+                snapshots.append(worker.call('get_metrics', timeout=5))
+            except Exception as e:
+                logging.error(f"Could not get metrics from worker {worker.index}: {e}")
+        return merge_snapshots(snapshots)
+
+    def is_running(self, bot_id: Optional[str] = None) -> bool:
+        """Check if a bot (or any bot when no ID is given) is currently running"""
+        if bot_id is not None:
+            worker = self._find_worker(bot_id)
+            if worker is None:
+                return False
+            try:
+                return worker.call('is_running', bot_id, timeout=5)
+            except Exception:
+                return False
+        return self.get_status()['running']
+
+    def get_status(self, bot_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get status for one bot, or a summary of all bots and workers"""
+        if bot_id is not None:
+            worker = self._find_worker(bot_id)
+            if worker is None:
+                return {'bot_id': bot_id, 'running': False, 'info': {}}
+            try:
+                status = worker.call('get_status', bot_id, timeout=5)
+            except Exception:
+                status = {'bot_id': bot_id, 'running': False, 'info': {}}
+            status['worker'] = worker.index
+            return status
+
+        bots = []
+        workers = []
+        for worker in list(self.workers):
+            alive = worker.is_alive()
+            if alive and worker.bots:
+                try:
+                    for status in worker.call('get_status', timeout=5)['bots']:
+                        status['worker'] = worker.index
+                        bots.append(status)
+                except Exception as e:
+                    logging.error(f"Could not get status from worker {worker.index}: {e}")
+            workers.append({
+                'index': worker.index,
+                'pid': worker.process.pid,
+                'alive': alive,
+                'bots': len(worker.bots)
+            })
+
+        running = [status for status in bots if status['running']]
+        return {
+            'running': bool(running),
+            'info': running[0]['info'] if running else {},
+            'has_token': bool(bots),
+            'bots': bots,
+            'workers': workers
+        }
+
+    def shutdown(self):
+        """Stop all bots and worker processes"""
+        with self._lock:
+            self._closed = True
+            workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.shutdown()
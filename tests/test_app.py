@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+import app as web
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(web.bot_manager, 'reload_commands', lambda: (True, "Reloaded"), raising=False)
+    return web.app.test_client()
+
+
+def test_admin_routes_are_closed_without_admin_token(client, monkeypatch):
+    monkeypatch.delenv('ADMIN_TOKEN', raising=False)
+    assert client.post('/admin/reload_commands').status_code == 403
+    assert client.post('/admin/reload_commands', headers={'X-Admin-Token': ''}).status_code == 403
+
+
+def test_admin_routes_need_the_right_token(client, monkeypatch):
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+    assert client.post('/admin/reload_commands', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    assert client.post('/admin/reload_commands', headers={'X-Admin-Token': 'secret'}).status_code == 200
+    assert client.post('/admin/reload_commands', data={'admin_token': 'secret'}).status_code == 200
+
+
+def test_job_long_poll_is_capped(client, monkeypatch):
+    waits = []
+    monkeypatch.setattr(web.bot_manager, 'get_job', lambda job_id, wait=None: waits.append(wait) or {'state': 'pending'}, raising=False)
+    client.get('/jobs/abc?wait=600')
+    assert waits == [web.MAX_JOB_WAIT]
+
+
+def test_status_streams_are_capped(client, monkeypatch):
+    monkeypatch.setattr(web, 'status_streams', threading.BoundedSemaphore(1))
+    first = client.get('/bot_status/stream', buffered=False)
+    assert first.status_code == 200
+    assert client.get('/bot_status/stream', buffered=False).status_code == 503
+
+    # Closing a stream frees its slot
+    first.close()
+    second = client.get('/bot_status/stream', buffered=False)
+    assert second.status_code == 200
+    second.close()
+
+
+def test_capture_route_is_admin_only_and_hashes_unless_configured(client, monkeypatch):
+    started = []
+    monkeypatch.setattr(web.bot_manager, 'start_capture', lambda hash_content=None: started.append(hash_content) or (True, "Capturing"), raising=False)
+    monkeypatch.delenv('ADMIN_TOKEN', raising=False)
+    assert client.post('/admin/capture').status_code == 403
+
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+    monkeypatch.delenv('GATEWAY_CAPTURE_HASH', raising=False)
+    headers = {'X-Admin-Token': 'secret'}
+    assert client.post('/admin/capture', data={'hash': '0'}, headers=headers).status_code == 403
+    assert client.post('/admin/capture', headers=headers).status_code == 200
+
+    monkeypatch.setenv('GATEWAY_CAPTURE_HASH', '0')
+    assert client.post('/admin/capture', data={'hash': '0'}, headers=headers).status_code == 200
+    assert started == [True, False]
+
+
+def test_loop_status_and_profiler_are_admin_only(client, monkeypatch):
+    limits = []
+    monkeypatch.setattr(web.bot_manager, 'get_profile', lambda bot_id, limit=20: limits.append(limit) or {}, raising=False)
+    monkeypatch.setattr(web.bot_manager, 'set_profiling', lambda bot_id, enabled: (True, "Profiling enabled"), raising=False)
+    monkeypatch.delenv('ADMIN_TOKEN', raising=False)
+    assert client.get('/loop_status').status_code == 403
+    assert client.post('/bots/1/profile').status_code == 403
+    assert client.get('/bots/1/profile').status_code == 403
+
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+    headers = {'X-Admin-Token': 'secret'}
+    assert client.get('/loop_status', headers=headers).status_code == 200
+    assert client.post('/bots/1/profile', headers=headers).status_code == 200
+    for limit in ('abc', '-5', '1000'):
+        assert client.get(f'/bots/1/profile?limit={limit}', headers=headers).status_code == 200
+    assert limits == [20, 1, 100]
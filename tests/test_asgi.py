@@ -0,0 +1,90 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+import app as web
+from asgi import asgi_app
+from status_events import StatusBroadcaster
+
+
+class FakeManager:
+    def __init__(self):
+        self.status_events = StatusBroadcaster()
+        self.running = False
+
+    def get_status(self, bot_id=None):
+        return {'running': self.running}
+
+    async def get_job_async(self, job_id, wait=None):
+        await asyncio.sleep(wait)
+        return {'job_id': job_id, 'state': 'pending'}
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    fake = FakeManager()
+    monkeypatch.setattr(web, 'bot_manager', fake)
+    return fake
+
+
+def request(path, query=b''):
+    """Start a GET through the ASGI app; returns (task, sent messages, disconnect)"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query,
+        'root_path': '', 'headers': [(b'host', b'localhost')], 'server': ('localhost', 80),
+        'client': ('127.0.0.1', 1234),
+    }
+    sent = []
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if not sent:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    return asyncio.ensure_future(asgi_app(scope, receive, send)), sent, disconnected.set
+
+
+def body(sent):
+    return b''.join(message.get('body', b'') for message in sent if message['type'] == 'http.response.body')
+
+
+def test_job_long_poll_does_not_hold_up_other_routes(manager):
+    async def scenario():
+        job, job_sent, _ = request('/jobs/abc', b'wait=1')
+        await asyncio.sleep(0.05)
+        status, status_sent, _ = request('/bot_status')
+        await asyncio.wait_for(status, 0.5)
+        assert not job.done()
+        await job
+        return job_sent, status_sent
+
+    job_sent, status_sent = asyncio.run(scenario())
+    assert json.loads(body(status_sent)) == {'running': False}
+    assert json.loads(body(job_sent))['state'] == 'pending'
+
+
+def test_status_stream_pushes_changes_until_the_client_leaves(manager):
+    async def scenario():
+        stream, sent, disconnect = request('/bot_status/stream')
+        while b'data:' not in body(sent):
+            await asyncio.sleep(0.01)
+        manager.running = True
+        # Status changes are published from the bot loop thread
+        threading.Thread(target=manager.status_events.publish).start()
+        while body(sent).count(b'data:') < 2:
+            await asyncio.sleep(0.01)
+        disconnect()
+        await asyncio.wait_for(stream, 1)
+        return sent
+
+    sent = asyncio.run(scenario())
+    assert sent[0]['status'] == 200
+    assert body(sent).decode().split('\n\n')[:2] == ['data: {"running": false}', 'data: {"running": true}']
@@ -0,0 +1,61 @@
+import asyncio
+import os
+
+from bot_manager import BotInstance, BotManager, StartJob
+
+
+def test_close_releases_stores_without_running_bots(tmp_path, monkeypatch):
+    monkeypatch.setenv('ECONOMY_DB', str(tmp_path / 'economy.db'))
+    monkeypatch.setenv('REMINDERS_PATH', str(tmp_path / 'reminders'))
+    manager = BotManager()
+    economy = manager.get_economy()
+    calculator = manager.get_calculator()
+    asyncio.run(calculator.calculate('1 + 1'))
+    scheduler = manager.get_scheduler()
+
+    async def remind():
+        scheduler.schedule('bot', 1, 2, 3600, 'remind', 'later')
+    asyncio.run(remind())
+
+    assert manager.close() == (True, "No bot was running")
+    assert economy._stop.is_set()
+    assert calculator._pool is None
+    assert os.path.exists(tmp_path / 'reminders' / 'bot.json')
+
+
+def test_giving_up_on_a_job_wait_leaves_the_start_running():
+    job = StartJob(BotInstance('bot', 'token'))
+    asyncio.run(job.wait_async(0.05))
+
+    assert not job.ready.cancelled()
+    assert job.to_dict()['state'] == 'pending'
+
+
+def test_sharded_bot_runs_while_any_shard_is_live(tmp_path, monkeypatch):
+    monkeypatch.setenv('REMINDERS_PATH', str(tmp_path / 'reminders'))
+    manager = BotManager()
+    instance = BotInstance('bot', 'token', shard_count=2)
+
+    async def scenario():
+        bot = manager.create_bot(instance)
+        instance.bot = bot
+        await bot.on_shard_connect(0)
+        await bot.on_shard_connect(1)
+        assert not instance.is_bot_running
+        instance.ready.set_result(True)
+        instance.is_bot_running = True
+
+        # Every shard disconnect also dispatches `disconnect`
+        await bot.on_disconnect()
+        await bot.on_shard_disconnect(0)
+        assert instance.is_bot_running
+        await bot.on_disconnect()
+        await bot.on_shard_disconnect(1)
+        assert not instance.is_bot_running
+
+        # A shard that identifies again gets no `ready`, only its shard events
+        await bot.on_shard_connect(1)
+        assert instance.is_bot_running
+
+    asyncio.run(scenario())
+    manager.close()
@@ -0,0 +1,59 @@
+import pytest
+
+from calculator import MAX_EXPRESSION_LENGTH, CalcError, evaluate, normalize
+
+
+def test_arithmetic():
+    assert evaluate(normalize('2^10 + (3 - 1) * 4')) == '1032'
+    assert evaluate('2**-1') == '0.5'
+
+
+@pytest.mark.parametrize('expression', [
+    '(2).real',
+    'x',
+    'abs(1)',
+    '__import__("os")',
+    '[x for x in (1,)]',
+    '(1).__class__',
+    '2 << 3',
+    '1 if 1 else 2',
+    '"text"',
+])
+def test_rejects_anything_but_numbers_and_operators(expression):
+    # The character check in normalize() stops these first; the evaluator must as well
+    with pytest.raises(CalcError):
+        normalize(expression)
+    with pytest.raises(CalcError, match="Invalid math expression"):
+        evaluate(expression)
+
+
+@pytest.mark.parametrize('expression', [
+    '9**9**9',
+    '2**4096',
+    '(10**999)**999',
+    '10**1000*10**1000',
+    '2 << 100000',
+])
+def test_refuses_huge_numbers(expression):
+    with pytest.raises(CalcError):
+        evaluate(expression)
+
+
+@pytest.mark.parametrize('expression', [
+    '-' * 5000 + '1',
+    '1' + '+1' * 20000,
+    '(' * 1000 + '1' + ')' * 1000,
+])
+def test_refuses_deep_nesting(expression):
+    with pytest.raises(CalcError):
+        evaluate(expression)
+
+
+def test_rejects_long_expressions():
+    with pytest.raises(CalcError, match="too long"):
+        normalize('1+' * MAX_EXPRESSION_LENGTH + '1')
+
+
+def test_division_by_zero():
+    with pytest.raises(CalcError, match="Division by zero"):
+        evaluate('1/0')
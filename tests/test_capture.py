@@ -0,0 +1,49 @@
+from bot_manager import BotManager
+from capture import hash_text
+
+
+class FakeCapture:
+    path = 'capture.jsonl'
+
+    def __init__(self):
+        self.records = []
+        self.recorded = 0
+
+    def record(self, *args):
+        self.records.append(args)
+
+    def close(self):
+        pass
+
+
+class FakeSocket:
+    def __init__(self):
+        self.debug = []
+        self.log_receive = self.debug.append
+
+
+def test_argument_digest_hides_the_whole_argument_string():
+    assert hash_text('!give <@123> 50', '!').startswith('!give #')
+    assert '123' not in hash_text('!give <@123> 50', '!')
+    assert hash_text('!ping', '!') == '!ping'
+
+
+def test_shape_mode_keeps_what_commands_parse():
+    assert hash_text('!give <@123> 50', '!', keep_shape=True) == '!give <@123> 50'
+    assert hash_text('!calc (2+3)*4', '!', keep_shape=True) == '!calc (2+3)*4'
+    say = hash_text('!say hello there', '!', keep_shape=True)
+    assert say.startswith('!say h') and 'hello' not in say and len(say.split(' ')) == 3
+
+
+def test_capture_keeps_discords_own_receive_hook():
+    manager = BotManager()
+    manager.capture = FakeCapture()
+    ws = FakeSocket()
+    manager._capture_socket('bot', 0, ws)
+    # Hooking the same socket again must not record twice
+    manager._capture_socket('bot', 0, ws)
+    ws.log_receive('{"op": 0}')
+
+    assert ws.debug == ['{"op": 0}']
+    assert manager.capture.records == [('bot', 0, '{"op": 0}')]
+    manager.close()
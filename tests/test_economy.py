@@ -0,0 +1,82 @@
+import asyncio
+import datetime
+import threading
+
+from economy import Economy, EconomyStore
+
+
+class BlockingStore(EconomyStore):
+    """In-memory store whose writes wait for the test and can be made to fail"""
+
+    def __init__(self):
+        self.rows = {}
+        self.loads = []
+        self.release = threading.Event()
+        self.writing = threading.Event()
+        self.fail = False
+
+    def load(self, key):
+        self.loads.append((key, threading.current_thread()))
+        return self.rows.get(key)
+
+    def save_many(self, rows):
+        self.writing.set()
+        self.release.wait(5)
+        if self.fail:
+            raise OSError("disk full")
+        for bot_id, user_id, balance, last_daily in rows:
+            self.rows[(bot_id, user_id)] = (balance, last_daily)
+
+
+def make_economy(store, max_cached=2):
+    return Economy(store, flush_interval=3600, max_cached=max_cached)
+
+
+def test_failed_flush_keeps_in_flight_accounts():
+    store = BlockingStore()
+    economy = make_economy(store)
+    economy.claim_daily('bot', 1, datetime.date(2026, 1, 1), 100)
+
+    store.fail = True
+    flusher = threading.Thread(target=economy.flush)
+    flusher.start()
+    assert store.writing.wait(5)
+    # Churn the cache while the write is in flight; the flushed account must stay
+    for user_id in range(10, 20):
+        economy.balance('bot', user_id)
+    store.release.set()
+    flusher.join(5)
+
+    assert economy.balance('bot', 1) == 100
+    store.fail = False
+    economy.flush()
+    assert store.rows[('bot', 1)][0] == 100
+    economy.close()
+
+
+def test_committed_accounts_become_evictable():
+    store = BlockingStore()
+    store.release.set()
+    economy = make_economy(store, max_cached=1)
+    economy.claim_daily('bot', 1, datetime.date(2026, 1, 1), 100)
+    economy.flush()
+    economy.balance('bot', 2)
+
+    assert ('bot', 1) not in economy._accounts
+    assert economy.balance('bot', 1) == 100
+    economy.close()
+
+
+def test_prefetch_reads_off_the_loop():
+    store = BlockingStore()
+    store.release.set()
+    economy = make_economy(store, max_cached=10)
+
+    async def command():
+        await economy.prefetch('bot', 1, 2)
+        return economy.transfer('bot', 1, 2, 0), threading.current_thread()
+
+    _, loop_thread = asyncio.run(command())
+    assert {key for key, _ in store.loads} == {('bot', 1), ('bot', 2)}
+    assert all(thread is not loop_thread for _, thread in store.loads)
+    economy.close()
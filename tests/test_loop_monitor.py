@@ -0,0 +1,29 @@
+import threading
+import time
+
+from loop_monitor import SamplingProfiler
+
+
+def test_profiler_samples_again_when_enabled_right_after_disable():
+    busy = threading.Event()
+
+    class Bot:
+        def work(self):
+            while not busy.is_set():
+                pass
+
+    bot = Bot()
+    worker = threading.Thread(target=bot.work, daemon=True)
+    worker.start()
+    profiler = SamplingProfiler(worker, interval=0.001)
+    try:
+        profiler.enable(bot)
+        profiler.disable(bot)
+        # The old sampler has not noticed its stop yet
+        profiler.enable(bot)
+        assert not profiler._stop.is_set()
+        time.sleep(0.2)
+        assert sum(profiler.samples[bot].values()) > 0
+    finally:
+        profiler.disable(bot)
+        busy.set()
@@ -0,0 +1,127 @@
+import asyncio
+import types
+
+import discord
+
+from outbound import OutboundQueue, QueuedContext
+from bot_commands import security, utility
+
+
+class FakeMessage:
+    def __init__(self, channel, content, embeds):
+        self.channel = channel
+        self.content = content
+        self.embeds = embeds
+        self.reactions = []
+        self.deleted = False
+
+    async def add_reaction(self, emoji):
+        self.reactions.append(emoji)
+
+    async def delete(self):
+        self.deleted = True
+
+
+class FakeChannel:
+    id = 1234
+    mention = '<#1234>'
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, embed=None, embeds=None):
+        # Yield like a REST call, so later sends queue up behind this one
+        await asyncio.sleep(0)
+        message = FakeMessage(self, content, embeds or ([embed] if embed is not None else []))
+        self.sent.append(message)
+        return message
+
+    async def purge(self, limit):
+        return [object()] * limit
+
+
+class FakeContext:
+    """Just enough of a Context for QueuedContext.send and add_reactions"""
+
+    send = QueuedContext.send
+    add_reactions = QueuedContext.add_reactions
+
+    def __init__(self, channel, outbound):
+        self.channel = channel
+        self.bot = types.SimpleNamespace(outbound=outbound)
+        self.author = types.SimpleNamespace(mention='<@1>', display_name='user')
+
+
+def queue_chatter(outbound, channel, count=3):
+    """Fire-and-forget replies of other commands waiting in the same channel"""
+    return [outbound.send(channel, embed=discord.Embed(title=f'joke {i}')) for i in range(count)]
+
+
+def test_fire_and_forget_sends_are_coalesced():
+    async def run():
+        channel = FakeChannel()
+        outbound = OutboundQueue('bot')
+        messages = await asyncio.gather(*queue_chatter(outbound, channel))
+        return channel, messages
+
+    channel, messages = asyncio.run(run())
+    assert len(channel.sent) == 1
+    assert all(message is channel.sent[0] for message in messages)
+
+
+def test_uncoalesced_send_gets_its_own_message():
+    async def run():
+        channel = FakeChannel()
+        outbound = OutboundQueue('bot')
+        first = queue_chatter(outbound, channel)
+        own = outbound.send(channel, embed=discord.Embed(title='mine'), coalesce=False)
+        last = queue_chatter(outbound, channel)
+        await asyncio.gather(*first, *last)
+        return await own
+
+    message = asyncio.run(run())
+    assert [embed.title for embed in message.embeds] == ['mine']
+
+
+def test_clear_never_deletes_a_merged_message(monkeypatch):
+    # Skip the 5 second pause before the confirmation is deleted
+    async def no_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(security, 'asyncio', types.SimpleNamespace(sleep=no_sleep))
+
+    async def run():
+        channel = FakeChannel()
+        outbound = OutboundQueue('bot')
+        before = queue_chatter(outbound, channel)
+        clear = asyncio.ensure_future(security.clear_command(FakeContext(channel, outbound), 5))
+        await asyncio.sleep(0)
+        after = queue_chatter(outbound, channel)
+        await asyncio.gather(clear, *before, *after)
+        return channel
+
+    channel = asyncio.run(run())
+    deleted = [message for message in channel.sent if message.deleted]
+    assert len(deleted) == 1
+    assert [embed.title for embed in deleted[0].embeds] == ['🧹 Messages Cleared']
+
+
+def test_poll_never_reacts_to_a_merged_message():
+    async def run():
+        channel = FakeChannel()
+        outbound = OutboundQueue('bot')
+        before = queue_chatter(outbound, channel)
+        poll = asyncio.ensure_future(utility.poll_command(FakeContext(channel, outbound), question='Pizza?'))
+        await asyncio.sleep(0)
+        after = queue_chatter(outbound, channel)
+        await asyncio.gather(poll, *before, *after)
+        # Reactions are queued at low priority behind the replies
+        for _ in range(10):
+            await asyncio.sleep(0)
+        return channel
+
+    channel = asyncio.run(run())
+    reacted = [message for message in channel.sent if message.reactions]
+    assert len(reacted) == 1
+    assert [embed.title for embed in reacted[0].embeds] == ['📊 Poll']
+    assert reacted[0].reactions == ['👍', '👎']
@@ -0,0 +1,32 @@
+from ratelimit import RateLimiter
+
+LIMITS = {'fun': {'user': (3, 10.0), 'guild': (60, 60.0)}}
+CATEGORIES = {'joke': 'fun'}
+
+
+def test_user_bucket_warns_once_per_window():
+    limiter = RateLimiter(LIMITS, CATEGORIES)
+    results = [limiter.hit(1, 100, 'joke') for _ in range(6)]
+    assert [wait == 0 for wait, _ in results] == [True, True, True, False, False, False]
+    assert [warn for _, warn in results] == [False, False, False, True, False, False]
+
+
+def test_guild_bucket_warns_once_for_many_users():
+    limiter = RateLimiter(LIMITS, CATEGORIES)
+    results = [limiter.hit(1, 1000 + user, 'joke') for user in range(300)]
+    rejected = [warn for wait, warn in results if wait > 0]
+    assert len(rejected) == 240
+    assert sum(rejected) == 1
+
+
+def test_guild_buckets_are_independent():
+    limiter = RateLimiter(LIMITS, CATEGORIES)
+    for user in range(61):
+        limiter.hit(1, 1000 + user, 'joke')
+    wait, warn = limiter.hit(2, 5000, 'joke')
+    assert wait == 0 and not warn
+
+
+def test_uncategorised_commands_are_not_limited():
+    limiter = RateLimiter(LIMITS, CATEGORIES)
+    assert all(limiter.hit(1, 100, 'ping') == (0.0, False) for _ in range(100))
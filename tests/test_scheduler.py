@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+from scheduler import ReminderScheduler
+
+
+async def deliver(bot_id, reminders):
+    return []
+
+
+def saved(path, bot_id='bot'):
+    with open(path / f'{bot_id}.json') as f:
+        return sorted(row[4] for row in json.load(f))
+
+
+def test_reminder_behind_the_next_one_is_saved(tmp_path):
+    path = tmp_path / 'reminders'
+
+    async def scenario():
+        scheduler = ReminderScheduler(deliver, str(path), save_delay=0.2)
+        scheduler.schedule('bot', 1, 2, 3600, 'remind', 'in an hour')
+        await asyncio.sleep(0.4)
+        assert saved(path) == ['in an hour']
+        # Not the next one due, so it doesn't move the timer's deadline
+        scheduler.schedule('bot', 1, 2, 7200, 'remind', 'in two hours')
+        await asyncio.sleep(0.4)
+        return saved(path)
+
+    assert asyncio.run(scenario()) == ['in an hour', 'in two hours']
+
+
+def test_processes_sharing_a_path_keep_each_others_reminders(tmp_path):
+    path = tmp_path / 'reminders'
+
+    async def scenario():
+        # Two supervisor workers, each running one bot
+        first = ReminderScheduler(deliver, str(path), save_delay=0)
+        second = ReminderScheduler(deliver, str(path), save_delay=0)
+        first.resume('a')
+        second.resume('b')
+        first.schedule('a', 1, 2, 3600, 'remind', 'from a')
+        second.schedule('b', 1, 2, 3600, 'remind', 'from b')
+        first.save()
+        second.save()
+
+        # After a restart a worker only loads the bots it runs
+        restarted = ReminderScheduler(deliver, str(path), save_delay=0)
+        restarted.resume('a')
+        return restarted
+
+    restarted = asyncio.run(scenario())
+    assert saved(path, 'a') == ['from a']
+    assert saved(path, 'b') == ['from b']
+    assert [reminder.text for reminder in restarted._heap] == ['from a']
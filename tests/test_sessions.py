@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+import aiohttp
+import discord
+import pytest
+from discord.gateway import DiscordWebSocket
+from discord.http import Route
+
+import sessions
+from bot_manager import BotInstance, BotManager
+from fake_discord import FakeDiscord, point_discord_py_at
+
+
+@pytest.fixture
+def fake(monkeypatch, tmp_path):
+    """A fake Discord on its own loop thread, with discord.py and the manager's files pointed at it"""
+    monkeypatch.setattr(Route, 'BASE', Route.BASE)
+    monkeypatch.setattr(DiscordWebSocket, 'DEFAULT_GATEWAY', DiscordWebSocket.DEFAULT_GATEWAY)
+    monkeypatch.setenv('ECONOMY_DB', str(tmp_path / 'economy.db'))
+    monkeypatch.setenv('REMINDERS_PATH', str(tmp_path / 'reminders'))
+    monkeypatch.setenv('SESSIONS_PATH', str(tmp_path / 'sessions'))
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = FakeDiscord(bots=1, guilds_per_bot=1)
+    point_discord_py_at(asyncio.run_coroutine_threadsafe(server.start(), loop).result(10))
+    # Count what the fake gateway receives
+    server.identifies = server.resumes = 0
+    identify = server._identify
+
+    async def counting_identify(bot, ws):
+        server.identifies += 1
+        await identify(bot, ws)
+
+    dispatch = server.dispatch
+
+    async def counting_dispatch(bot, event, data):
+        if event == 'RESUMED':
+            server.resumes += 1
+        await dispatch(bot, event, data)
+
+    server._identify = counting_identify
+    server.dispatch = counting_dispatch
+    yield server
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def start(manager, fake):
+    success, message = manager.start_bot(fake.tokens[0], timeout=30)
+    assert success, message
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def test_restart_resumes_the_saved_session(fake, tmp_path):
+    manager = BotManager()
+    start(manager, fake)
+    assert manager.close() == (True, "Bot stopped successfully")
+    assert len(list((tmp_path / 'sessions').iterdir())) == 1
+
+    restarted = BotManager()
+    start(restarted, fake)
+    wait_for(lambda: fake.resumes == 1)
+    assert fake.identifies == 1
+    restarted.stop_bot()
+
+
+def test_explicit_stop_ends_the_session(fake, tmp_path):
+    manager = BotManager()
+    start(manager, fake)
+    assert manager.stop_bot() == (True, "Bot stopped successfully")
+    assert not (tmp_path / 'sessions').exists() or not list((tmp_path / 'sessions').iterdir())
+
+    restarted = BotManager()
+    start(restarted, fake)
+    assert fake.identifies == 2
+    assert fake.resumes == 0
+    restarted.stop_bot()
+
+
+def test_untracked_clients_connect_unchanged():
+    client = discord.Client(intents=discord.Intents.none())
+    assert DiscordWebSocket.from_client.__func__.__module__ == 'discord.gateway'
+    assert client.http.ws_connect.__func__ is discord.http.HTTPClient.ws_connect
+    assert client._connection._update_references.__func__ is discord.state.ConnectionState._update_references
+
+    sessions.track_sockets(client)
+    assert client.http.ws_connect.__module__ == 'sessions'
+    assert discord.Client(intents=discord.Intents.none()).http.ws_connect.__func__ is discord.http.HTTPClient.ws_connect
+
+
+def test_session_store_hands_out_a_session_once(tmp_path):
+    store = sessions.SessionStore(str(tmp_path), max_age=60)
+    store.save('1', {0: {'session_id': 'abc', 'sequence': 5, 'gateway': 'wss://example'}}, None, {}, [10])
+    saved = store.take('1')
+    assert saved['shards'] == {0: {'session_id': 'abc', 'sequence': 5, 'gateway': 'wss://example'}}
+    assert saved['guilds'] == [10]
+    assert store.take('1') is None
+
+
+def test_session_store_drops_stale_sessions(tmp_path):
+    store = sessions.SessionStore(str(tmp_path), max_age=0)
+    store.save('1', {0: {'session_id': 'abc', 'sequence': 5, 'gateway': 'wss://example'}}, None, {}, [])
+    time.sleep(0.01)
+    assert store.take('1') is None
+
+
+def test_restore_guilds_survives_connection_errors():
+    class HTTP:
+        async def get_guild(self, guild_id, with_counts=True):
+            raise aiohttp.ClientConnectionError("Connection closed")
+
+    class Client:
+        http = HTTP()
+        _connection = type('State', (), {'_get_guild': lambda self, guild_id: None})()
+
+    assert asyncio.run(sessions.restore_guilds(Client(), [1, 2])) == 0
+
+
+def test_closing_a_bot_cancels_its_guild_restore(tmp_path, monkeypatch):
+    monkeypatch.setenv('REMINDERS_PATH', str(tmp_path / 'reminders'))
+    manager = BotManager()
+    instance = BotInstance('bot', 'token')
+
+    async def scenario():
+        instance.restore_task = asyncio.ensure_future(asyncio.sleep(60))
+        await manager._close_instance(instance)
+        await asyncio.sleep(0)
+        return instance.restore_task.cancelled()
+
+    assert asyncio.run(scenario())
+    manager.close()
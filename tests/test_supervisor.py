@@ -0,0 +1,45 @@
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from supervisor import BotSupervisor
+
+TOKEN = 'ODAwMDAwMDAwMDAwMDAwMDAw.' + 'x' * 6 + '.' + 'y' * 38
+
+
+@pytest.fixture
+def supervisor():
+    supervisor = BotSupervisor(workers=1)
+    yield supervisor
+    supervisor.shutdown()
+
+
+def test_rejected_start_is_not_placed(supervisor):
+    success, message, job_id = supervisor.start_bot_async(TOKEN, cache_profile='bogus')
+    assert not success
+    assert job_id is None
+    assert all(not worker.bots for worker in supervisor.workers)
+    assert supervisor.bot_options == {}
+
+
+def test_timed_out_call_is_forgotten(supervisor):
+    supervisor._ensure_workers()
+    worker = supervisor.workers[0]
+    with pytest.raises(FutureTimeoutError):
+        worker.call('get_status', timeout=0)
+    assert worker._pending == {}
+    # The late reply is dropped and the worker keeps answering
+    assert worker.call('get_status', timeout=30)['bots'] == []
+
+
+def test_failed_start_job_forgets_the_placement(supervisor, monkeypatch):
+    supervisor._ensure_workers()
+    worker = supervisor.workers[0]
+    worker.bots['bot'] = TOKEN
+    supervisor.bot_options['bot'] = {'cache_profile': 'lean'}
+    supervisor.jobs['job'] = worker
+    monkeypatch.setattr(worker, 'call', lambda *args, **kwargs: {'bot_id': 'bot', 'state': 'failed', 'error': 'Improper token'})
+
+    assert supervisor.get_job('job')['state'] == 'failed'
+    assert worker.bots == {}
+    assert supervisor.bot_options == {}